@@ -0,0 +1,26 @@
+"""
+Door dates for calendars of any length. Every calendar counts down to
+Christmas Eve, so the last door always opens on December 24th
+(12 doors -> Dec 13-24, 24 doors -> Dec 1-24, 365 doors -> a whole year).
+"""
+from datetime import date, timedelta
+
+DOOR_COUNTS = (12, 24, 31, 365)
+DEFAULT_DOOR_COUNT = 12
+
+
+def door_unlock_date(door_num, door_count, year):
+    """date the door opens for a calendar ending on Dec 24th of year"""
+    return date(year, 12, 24) - timedelta(days=door_count - door_num)
+
+
+def first_unlock_date(door_count, year):
+    return door_unlock_date(1, door_count, year)
+
+
+def door_dates(door_count, year=None):
+    """
+    day of the month each door opens on (the door.date_day column)
+    """
+    year = year or date.today().year
+    return [door_unlock_date(n, door_count, year).day for n in range(1, door_count + 1)]
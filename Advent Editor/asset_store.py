@@ -0,0 +1,58 @@
+"""
+Door images in assets/ as a content addressed store.
+
+Uploads are ingested into files named by the sha256 of their content (see
+ingest.py), the database counts how many doors use each file (the asset
+table) and collect_garbage deletes the stored files no door uses any more.
+"""
+import os
+import re
+
+from tracing import traced
+
+# file names ingest_image gives stored images; nothing else in assets/ is
+# ever deleted (e.g. door{n} images from before the store)
+BLOB_NAME = re.compile(r"[0-9a-f]{64}\.(?:jpg|png)")
+
+
+def in_store(path, store_dir):
+    """
+    true if path is a file in the store; a string check only, so saving a
+    door whose image is already stored touches nothing on disk
+    """
+    return os.path.dirname(os.path.abspath(path)) == os.path.abspath(store_dir)
+
+
+@traced()
+def unused_files(repo, store_dir):
+    """
+    (path as stored in the asset table, file) for each stored image whose
+    refcount dropped to zero
+    """
+    keep = {os.path.normcase(path) for path in repo.referenced_assets()}
+    unused = []
+    for stored, path in repo.unreferenced_assets():
+        if (in_store(path, store_dir) and BLOB_NAME.fullmatch(os.path.basename(path))
+                and os.path.normcase(path) not in keep and os.path.isfile(path)):
+            unused.append((stored, path))
+    return unused
+
+
+@traced()
+def collect_garbage(repo, store_dir):
+    """
+    delete the stored images no door uses any more (see unused_files).
+    Run it where no door write can interleave, e.g. as a job on the
+    write-behind queue. Returns (files removed, bytes freed)
+    """
+    removed = freed = 0
+    for stored, path in unused_files(repo, store_dir):
+        size = os.path.getsize(path)
+        try:
+            os.remove(path)
+        except OSError:
+            continue  # e.g. open in another program on windows, next time
+        repo.forget_asset(stored)
+        removed += 1
+        freed += size
+    return removed, freed
@@ -0,0 +1,98 @@
+"""
+Write-behind queue: database writes and file copies run on a background
+thread so the Tk thread never waits on the disk.
+"""
+import queue
+import threading
+from collections import OrderedDict
+
+from database import SqliteRepo
+
+
+class WriteBehindQueue:
+    """
+    Coalescing queue feeding one writer thread. Submitting a job for a key
+    that is still waiting replaces it, so only the latest state per door is
+    written. Completions are collected and handed to the Tk thread by poll(),
+    which the app runs from after().
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._pending = OrderedDict()   # key -> (job, state, on_done)
+        self._cond = threading.Condition()
+        self._busy = False
+        self._inflight = None           # (key, state) being written right now
+        self._closed = False
+        self._done = queue.Queue()      # (on_done, result, error)
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+
+    def submit(self, key, job, state=None, on_done=None):
+        """
+        job(repo) runs on the writer thread with its own SqliteRepo.
+        on_done(result, error) is called later on the Tk thread by poll()
+        """
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("write-behind queue is closed")
+            self._pending.pop(key, None)
+            self._pending[key] = (job, state, on_done)
+            self._cond.notify()
+
+    def pending_state(self, key):
+        """state of a job that hasn't been written yet (None if nothing waits)"""
+        with self._cond:
+            item = self._pending.get(key)
+            if item:
+                return item[1]
+            if self._inflight and self._inflight[0] == key:
+                return self._inflight[1]
+            return None
+
+    def poll(self):
+        """run completion callbacks; call from the Tk thread only"""
+        while True:
+            try:
+                on_done, result, error = self._done.get_nowait()
+            except queue.Empty:
+                return
+            if on_done is not None:
+                on_done(result, error)
+
+    def flush(self, timeout=None):
+        """block until everything submitted so far is written"""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._pending and not self._busy, timeout)
+
+    def close(self):
+        """write what is still pending, then stop the writer thread"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+        self.poll()
+
+    def _run(self):
+        repo = SqliteRepo(self.db_path, shared=False)
+        try:
+            while True:
+                with self._cond:
+                    self._cond.wait_for(lambda: self._pending or self._closed)
+                    if not self._pending:
+                        return  # closed and drained
+                    key, (job, state, on_done) = self._pending.popitem(last=False)
+                    self._inflight = (key, state)
+                    self._busy = True
+                result = error = None
+                try:
+                    result = job(repo)
+                except Exception as e:
+                    error = e
+                self._done.put((on_done, result, error))
+                with self._cond:
+                    self._inflight = None
+                    self._busy = False
+                    self._cond.notify_all()
+        finally:
+            repo.close()
@@ -0,0 +1,224 @@
+"""
+Headless batch export: one calendar per recipient, built in parallel.
+
+    python batch.py recipients.json out/ [--bundle] [--exe] [--workers N]
+
+JSON manifest, a list of
+    {"name": "Sarah", "door_count": 12,
+     "doors": [{"message": "...", "image": "photos/sarah1.jpg"}, ...]}
+CSV manifest: columns name, door_count (optional), message1, image1,
+message2, image2, ... Image paths are relative to the manifest file.
+"""
+import argparse
+import csv
+import functools
+import json
+import os
+import re
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from config import (
+    SHAPES_DIR, EXPORT_CACHE_DIR, EXPORT_MANIFEST_DIR, VIEWER_FILES, DOOR_COUNTS, DEFAULT_DOOR_COUNT
+)
+from database import SqliteRepo
+from exporter import ExportJob, DB_NAME, exe_artifact
+from ingest import ingest_image
+import shape_variants
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+# workers are replaced after this many calendars, so memory held on to
+# after decoding large photos is given back
+TASKS_PER_WORKER = 8
+
+
+# ------------------------------ manifest ------------------------------
+def load_manifest(path):
+    """list of calendars: index, name, door_count, doors [{message, image}]"""
+    base = os.path.dirname(os.path.abspath(path))
+    if path.lower().endswith(".csv"):
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            rows = [_csv_row(row) for row in csv.DictReader(f)]
+    else:
+        with open(path, encoding="utf-8") as f:
+            rows = json.load(f)
+
+    calendars = []
+    for index, row in enumerate(rows, start=1):
+        name = (row.get("name") or "").strip()
+        doors = row.get("doors") or []
+        door_count = int(row.get("door_count") or max(DEFAULT_DOOR_COUNT, len(doors)))
+        if not name:
+            raise ValueError(f"row {index}: name is missing")
+        if door_count not in DOOR_COUNTS:
+            raise ValueError(f"row {index}: door_count must be one of {DOOR_COUNTS}")
+        if len(doors) > door_count:
+            raise ValueError(f"row {index}: {len(doors)} doors for a {door_count}-door calendar")
+        calendars.append({
+            "index": index,
+            "name": name,
+            "door_count": door_count,
+            "doors": [
+                {"message": door.get("message") or None,
+                 "image": os.path.join(base, door["image"]) if door.get("image") else None}
+                for door in doors
+            ],
+        })
+    return calendars
+
+
+def _csv_row(row):
+    doors = []
+    n = 1
+    while f"message{n}" in row or f"image{n}" in row:
+        doors.append({"message": row.get(f"message{n}"), "image": row.get(f"image{n}")})
+        n += 1
+    return {"name": row.get("name"), "door_count": row.get("door_count"), "doors": doors}
+
+
+def folder_name(calendar):
+    slug = re.sub(r"[^\w\- ]", "", calendar["name"]).strip() or "calendar"
+    return f"{calendar['index']:03d} {slug}"
+
+
+# ------------------------------ worker ------------------------------
+def build_calendar(calendar, out_dir, bundle, build_exe, build_cache_dir):
+    """
+    database + ingested images in a scratch folder, then an export into
+    out_dir. Runs in a worker process; returns timings in seconds
+    """
+    start = time.perf_counter()
+    folder = folder_name(calendar)
+    work = os.path.join(out_dir, ".work", folder)
+    shutil.rmtree(work, ignore_errors=True)
+    os.makedirs(work)
+    db_file = os.path.join(work, DB_NAME)
+    assets_dir = os.path.join(work, "assets")
+    try:
+        with SqliteRepo(db_file, shared=False) as repo:
+            repo.set_viewer_name(calendar["name"])
+            repo.set_door_count(calendar["door_count"])
+            with repo.batch():
+                for door_num, door in enumerate(calendar["doors"], start=1):
+                    image = door["image"]
+                    if image:
+                        stored = ingest_image(image, assets_dir)
+                        # relative to the export, where assets/ sits next to the viewer
+                        image = os.path.join("assets", os.path.basename(stored))
+                    repo.update_door(door_num, door["message"], image)
+        ingested = time.perf_counter()
+
+        job = ExportJob(
+            dest_folder=os.path.join(out_dir, folder),
+            src_dir=SRC_DIR,
+            viewer_files=VIEWER_FILES,
+            db_file=db_file,
+            shapes_dir=SHAPES_DIR,
+            cache_dir=os.path.join(work, "cache"),
+            manifest_dir=EXPORT_MANIFEST_DIR,
+            bundle=bundle,
+            build_exe=build_exe,
+            build_cache_dir=build_cache_dir,
+            scale_shapes=False,  # done once by main()
+        )
+        job.run()
+        warnings = []
+        while not job.events.empty():
+            event = job.events.get_nowait()
+            if event[0] == "error":
+                raise RuntimeError(event[1])
+            if event[0] == "warning":
+                warnings.append(event[1])
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+    end = time.perf_counter()
+    return {
+        "dest": job.dest_folder,
+        "ingest": ingested - start,
+        "export": end - ingested,
+        "total": end - start,
+        "warnings": warnings,
+    }
+
+
+# ------------------------------ main ------------------------------
+def _report(calendar, result=None, error=None):
+    label = f"{calendar['index']:>4} {calendar['name'][:24]:<24}"
+    if error is not None:
+        print(f"{label} FAILED: {error}", flush=True)
+        return
+    warnings = f"  ({'; '.join(sorted(set(result['warnings'])))})" if result["warnings"] else ""
+    print(f"{label} ingest {result['ingest']:6.2f}s  export {result['export']:6.2f}s  "
+          f"total {result['total']:6.2f}s  -> {result['dest']}{warnings}", flush=True)
+
+
+def _pool(workers):
+    try:
+        return ProcessPoolExecutor(max_workers=workers, max_tasks_per_child=TASKS_PER_WORKER)
+    except TypeError:  # python < 3.11
+        return ProcessPoolExecutor(max_workers=workers)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build and export calendars for many recipients without the editor UI.")
+    parser.add_argument("manifest", help="JSON or CSV file, one row per recipient")
+    parser.add_argument("out_dir", help="folder that receives one export folder per calendar")
+    parser.add_argument("--bundle", action="store_true", help="pack each calendar into a single calendar.advent")
+    parser.add_argument("--exe", action="store_true", help="also add RUN.exe / RUN.app (built once, then reused)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes (default: one per core)")
+    args = parser.parse_args(argv)
+
+    try:
+        calendars = load_manifest(args.manifest)
+    except (OSError, ValueError, KeyError) as e:
+        parser.error(f"bad manifest: {e}")
+    out_dir = os.path.abspath(args.out_dir)
+    os.makedirs(out_dir, exist_ok=True)
+
+    build_exe = args.exe
+    if build_exe and exe_artifact() is None:
+        print("--exe: no standalone app is made on this platform, exporting without one")
+        build_exe = False
+
+    # shared by every export; done once here instead of racing in the workers
+    shape_variants.build(SHAPES_DIR)
+    work = functools.partial(build_calendar, out_dir=out_dir, bundle=args.bundle, build_exe=build_exe,
+                             build_cache_dir=os.path.join(EXPORT_CACHE_DIR, "builds"))
+
+    start = time.perf_counter()
+    failed = 0
+    pending = list(calendars)
+    if build_exe and pending:
+        # the first export runs PyInstaller, the others reuse its cached build
+        first = pending.pop(0)
+        try:
+            _report(first, work(first))
+        except Exception as e:
+            _report(first, error=e)
+            failed += 1
+            # don't start one competing PyInstaller run per worker
+            print("the first export (which builds the executable) failed, "
+                  "exporting the rest without one")
+            work = functools.partial(work, build_exe=False)
+
+    if pending:
+        with _pool(args.workers) as pool:
+            futures = {pool.submit(work, calendar): calendar for calendar in pending}
+            for future in as_completed(futures):
+                try:
+                    _report(futures[future], future.result())
+                except Exception as e:
+                    _report(futures[future], error=e)
+                    failed += 1
+
+    elapsed = time.perf_counter() - start
+    print(f"{len(calendars) - failed} of {len(calendars)} calendars exported in {elapsed:.1f}s")
+    shutil.rmtree(os.path.join(out_dir, ".work"), ignore_errors=True)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,221 @@
+"""
+Single-file calendar bundle (.advent).
+
+Layout:
+    b"ADVENTB1"                      magic
+    member data, one after another   stored as-is or zlib compressed
+    index (JSON)                     name -> offset, size, stored_size, method
+    footer: index offset, index length, magic
+
+The reader maps the file once and reads members lazily by offset. Stored
+members are handed out as memoryview slices of the map, without copying.
+"""
+import io
+import json
+import mmap
+import os
+import struct
+import zlib
+
+MAGIC = b"ADVENTB1"
+FOOTER = struct.Struct("<QQ8s")
+BUNDLE_NAME = "calendar.advent"
+
+# already compressed formats gain nothing from zlib
+STORED_EXTENSIONS = {".png", ".jpg", ".jpeg", ".gif", ".webp", ".bmp"}
+
+
+class BundleError(Exception):
+    pass
+
+
+class BundleWriter:
+    """
+    with BundleWriter(path) as w:
+        w.add_file("advent.db", db_path)
+        w.add_file("shapes/tree.png", tree_path)
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._f = open(path, "wb")
+        self._f.write(MAGIC)
+        self._index = {}
+
+    def add_file(self, name, src_path, compress=None, chunk_size=1024 * 1024):
+        if compress is None:
+            compress = os.path.splitext(name)[1].lower() not in STORED_EXTENSIONS
+        offset = self._f.tell()
+        size = 0
+        packer = zlib.compressobj(6) if compress else None
+        with open(src_path, "rb") as src:
+            for chunk in iter(lambda: src.read(chunk_size), b""):
+                size += len(chunk)
+                self._f.write(packer.compress(chunk) if packer else chunk)
+        if packer:
+            self._f.write(packer.flush())
+        self._add_entry(name, offset, size, compress)
+
+    def add_bytes(self, name, data, compress=True):
+        offset = self._f.tell()
+        self._f.write(zlib.compress(data, 6) if compress else data)
+        self._add_entry(name, offset, len(data), compress)
+
+    def _add_entry(self, name, offset, size, compress):
+        self._index[name.replace(os.sep, "/")] = {
+            "offset": offset,
+            "size": size,
+            "stored_size": self._f.tell() - offset,
+            "method": "zlib" if compress else "stored",
+        }
+
+    def close(self):
+        if self._f.closed:
+            return
+        index = json.dumps({"version": 1, "members": self._index}).encode("utf-8")
+        index_offset = self._f.tell()
+        self._f.write(index)
+        self._f.write(FOOTER.pack(index_offset, len(index), MAGIC))
+        self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class BundleReader:
+    """
+    Opens a bundle once; members are read on demand by name.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.mtime = os.path.getmtime(path)
+        self._f = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._f.close()
+            raise BundleError(f"{path} is empty")
+        self._view = memoryview(self._map)
+        if self._view[:len(MAGIC)] != MAGIC or len(self._view) < len(MAGIC) + FOOTER.size:
+            self.close()
+            raise BundleError(f"{path} is not a calendar bundle")
+        index_offset, index_length, magic = FOOTER.unpack(self._view[-FOOTER.size:])
+        if magic != MAGIC:
+            self.close()
+            raise BundleError(f"{path} is truncated")
+        index = json.loads(bytes(self._view[index_offset:index_offset + index_length]))
+        self.members = index["members"]
+
+    def __contains__(self, name):
+        return name in self.members
+
+    def read(self, name):
+        """
+        member content: a memoryview into the map for stored members
+        (no copy), bytes for compressed ones
+        """
+        try:
+            entry = self.members[name]
+        except KeyError:
+            raise BundleError(f"no member {name!r} in {self.path}") from None
+        data = self._view[entry["offset"]:entry["offset"] + entry["stored_size"]]
+        if entry["method"] == "stored":
+            return data
+        return zlib.decompress(data)
+
+    def open(self, name):
+        """file-like object over a member, e.g. for Image.open"""
+        return io.BufferedReader(_MemberFile(self.read(name)))
+
+    def close(self):
+        if self._view is None:
+            return
+        try:
+            self._view.release()
+            self._map.close()
+        except BufferError:
+            pass  # a member is still open, the map goes away with it
+        self._view = None
+        self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class _MemberFile(io.RawIOBase):
+    """seekable read-only file over a memoryview / bytes, without copying it"""
+
+    def __init__(self, data):
+        super().__init__()
+        self._data = memoryview(data)
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, buffer):
+        n = min(len(buffer), len(self._data) - self._pos)
+        buffer[:n] = self._data[self._pos:self._pos + n]
+        self._pos += n
+        return n
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += len(self._data)
+        self._pos = max(0, offset)
+        return self._pos
+
+    def tell(self):
+        return self._pos
+
+    def close(self):
+        if not self.closed:
+            self._data.release()
+        super().close()
+
+
+class BundleSource:
+    """
+    image_cache source reading "shapes/..." and "assets/..." from a bundle
+    """
+
+    def __init__(self, reader):
+        self.reader = reader
+
+    def exists(self, path):
+        return member_name(path) in self.reader
+
+    def mtime(self, path):
+        return self.reader.mtime
+
+    def open(self, path):
+        return self.reader.open(member_name(path))
+
+
+def member_name(path):
+    """bundle member for a relative path like shapes/tree.png"""
+    return os.path.normpath(path).replace(os.sep, "/")
+
+
+def write_bundle(path, files):
+    """
+    files: iterable of (member name, source path). Written to a temp file
+    first so a half written bundle never replaces a good one
+    """
+    tmp = path + ".partial"
+    with BundleWriter(tmp) as writer:
+        for name, src in files:
+            writer.add_file(name, src)
+    os.replace(tmp, path)
@@ -1,17 +1,48 @@
 import os
 
+from advent_dates import DOOR_COUNTS, DEFAULT_DOOR_COUNT, door_dates
+
 BASE_DIR = os.path.dirname(os.path.dirname(__file__))
 SHAPES_DIR = os.path.join(BASE_DIR, "shapes")
 ASSETS_DIR = os.path.join(BASE_DIR, "assets")
+# untouched uploads, kept outside assets so they are never exported
+ORIGINALS_DIR = os.path.join(BASE_DIR, "originals")
+KEEP_ORIGINAL_UPLOADS = False
 DB_FILE = os.path.join(BASE_DIR, "advent.db")
+# content hashes and cached PyInstaller builds for incremental exports
+EXPORT_CACHE_DIR = os.path.join(BASE_DIR, ".export_cache")
+# what was last written into each export folder (kept out of the folder itself)
+EXPORT_MANIFEST_DIR = os.path.join(EXPORT_CACHE_DIR, "manifests")
+# door previews shown on the editor grid
+THUMB_CACHE_DIR = os.path.join(BASE_DIR, ".thumb_cache")
+# rendered card / door / button shapes (see sprites.py)
+SPRITE_CACHE_DIR = os.path.join(BASE_DIR, ".sprite_cache")
 
 
 WINDOW_WIDTH = 760
 WINDOW_HEIGHT = 360
 PEACH = "#dba582"
 
-# Advent dates: 12-day calendar, days 13–24
-DOOR_DATES = [13 + i for i in range(12)]
+# memory budget for the shared decoded/resized image cache
+IMAGE_CACHE_BYTES = 64 * 1024 * 1024
+
+# files copied next to the exported viewer (it imports the shared modules)
+VIEWER_FILES = ["viewer.py", "image_cache.py", "pages.py",
+                "door_grid.py", "ui_helpers.py", "advent_dates.py",
+                "bundle.py", "prefetch.py", "sprites.py",
+                "shape_variants.py", "viewer_state.py", "startup_profile.py",
+                "tracing.py", "stall_watchdog.py"]
+
+# Advent dates: default 12-day calendar, days 13–24 (see advent_dates.py)
+DOOR_DATES = door_dates(DEFAULT_DOOR_COUNT)
+
+# delay after the last keystroke before a door is autosaved
+AUTOSAVE_DELAY_MS = 800
+
+# door search: delay after the last keystroke, and how many doors are listed
+SEARCH_DELAY_MS = 150
+SEARCH_RESULTS = 20
 
-# Ensure assets directory exists
-os.makedirs(ASSETS_DIR, exist_ok=True)
+# rows of doors drawn at once in the grid, the rest is reached by scrolling
+VISIBLE_DOOR_ROWS = 3
+MAX_DOOR_COLUMNS = 4
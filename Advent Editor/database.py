@@ -1,22 +1,148 @@
 """
 imports sql library
 """
+import csv
+import json
+import os
 import sqlite3
-from config import DB_FILE, DOOR_DATES
+from collections import namedtuple
+from contextlib import contextmanager
+from config import DB_FILE, DOOR_DATES, DEFAULT_DOOR_COUNT, door_dates
+from tracing import traced
+
+# bump when the schema changes and add a step to SqliteRepo.ensure_db
+SCHEMA_VERSION = 4
+
+# lightweight row returned by the bulk readers
+DoorRecord = namedtuple("DoorRecord", "door_num date_day message image_path")
+
+# one search() result; snippet marks the matched words with the highlight markers
+SearchHit = namedtuple("SearchHit", "calendar_id title door_num snippet")
+
+# ranking reads the statistics of every matching door; a query matching more
+# doors than this (a word found in most messages) lists the newest doors first
+RANKED_MATCHES = 2000
+
+# columns of a door import / export file (JSON Lines keys or CSV header)
+DOOR_FIELDS = ("door_num", "message", "image")
+
+
+def _is_csv(path):
+    return path.lower().endswith(".csv")
+
+
+def _fts_query(text):
+    """
+    search box text -> FTS5 query. Every word has to match; words are quoted
+    so FTS5 syntax typed by the user is taken literally, and the last one
+    (from two characters on) matches as a prefix so results show up while it
+    is still being typed
+    """
+    words = [word for word in text.split() if any(ch.isalnum() for ch in word)]
+    terms = ['"' + word.replace('"', '""') + '"' for word in words]
+    # a single letter would match a prefix of nearly every message
+    if words and len(words[-1]) > 1:
+        terms[-1] += "*"
+    return " ".join(terms)
+
+
+class _SharedConnection:
+    """one connection per database file, shared by every SqliteRepo in the process"""
+
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path, timeout=10)
+        # WAL lets the UI keep reading while the autosave thread writes
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.refs = 0
+        self.batch_depth = 0
+        # calendar the editor is working on, shared like the connection
+        self.calendar_id = None
+
+
+# abs path -> _SharedConnection
+_connections = {}
+
 
 class SqliteRepo:
     """Handles all DB operations cleanly."""
 
-    def __init__(self):
-        self.conn = sqlite3.connect(DB_FILE)
-        self.ensure_db()
+    def __init__(self, db_path=DB_FILE, shared=True):
+        """
+        shared=False gives a private connection, e.g. for a background thread
+        (sqlite connections can't be used across threads)
+        """
+        self.db_path = os.path.abspath(db_path)
+        self._private = not shared
+        self._shared = None if self._private else _connections.get(self.db_path)
+        if self._shared is None:
+            self._shared = _SharedConnection(self.db_path)
+            if not self._private:
+                _connections[self.db_path] = self._shared
+            self.conn = self._shared.conn
+            self.ensure_db()
+        self._shared.refs += 1
+        self.conn = self._shared.conn
+        self._closed = False
+
+    # ------------------------------ transactions ------------------------------
+    def _commit(self):
+        """commit now, unless a batch() is open (it commits once at the end)"""
+        if self._shared.batch_depth == 0:
+            self.conn.commit()
 
+    @contextmanager
+    def batch(self):
+        """
+        group several writes into one transaction:
+
+            with repo.batch():
+                repo.update_door(...)
+                repo.set_viewer_name(...)
+        """
+        self._shared.batch_depth += 1
+        try:
+            yield self
+        except BaseException:
+            self._shared.batch_depth -= 1
+            if self._shared.batch_depth == 0:
+                self.conn.rollback()
+            raise
+        self._shared.batch_depth -= 1
+        if self._shared.batch_depth == 0:
+            self.conn.commit()
+
+    @traced()
     def ensure_db(self):
         """
-        Creates database structure (doors)
+        Creates database structure (doors). Only runs the first time a file
+        is opened or after SCHEMA_VERSION goes up, tracked in PRAGMA user_version
         """
         c = self.conn.cursor()
+        version = c.execute("PRAGMA user_version").fetchone()[0]
+        if version >= SCHEMA_VERSION:
+            return
 
+        # all steps in one transaction: a failed migration leaves the old schema
+        c.execute("BEGIN")
+        try:
+            if version < 1:
+                self._create_schema(c)
+            if version < 2:
+                self._migrate_to_calendars(c)
+            if version < 3:
+                self._create_message_index(c)
+            if version < 4:
+                self._create_asset_refs(c)
+            c.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        except BaseException:
+            self.conn.rollback()
+            raise
+        self.conn.commit()
+
+    def _create_schema(self, c):
+        """
+        version 1: the original single calendar tables
+        """
         c.execute("""
             CREATE TABLE IF NOT EXISTS viewer (
                 id INTEGER PRIMARY KEY,
@@ -38,32 +164,280 @@ class SqliteRepo:
                 value TEXT
             )""")
 
-        for i, day in enumerate(DOOR_DATES, start=1):
-            c.execute("""
-                INSERT OR IGNORE INTO door(door_num, date_day, message, image_path)
-                VALUES (?, ?, ?, ?)""",
-                (i, day, None, None))
+        self._seed_doors_v1(c, DOOR_DATES)
 
-        self.conn.commit()
+    def _seed_doors_v1(self, c, days):
+        c.executemany("""
+            INSERT OR IGNORE INTO door(door_num, date_day, message, image_path)
+            VALUES (?, ?, NULL, NULL)""",
+            enumerate(days, start=1))
+
+    def _migrate_to_calendars(self, c):
+        """
+        version 2: many calendars per file. The existing doors, viewer name
+        and door count become calendar 1; door and viewer are rebuilt keyed
+        by calendar_id since door_num is no longer unique on its own
+        """
+        c.execute("""
+            CREATE TABLE calendar (
+                id INTEGER PRIMARY KEY,
+                title TEXT NOT NULL,
+                door_count INTEGER NOT NULL
+            )""")
+        c.execute("""
+            INSERT INTO calendar(id, title, door_count) VALUES (
+                1,
+                COALESCE((SELECT name FROM viewer ORDER BY id DESC LIMIT 1), 'Calendar 1'),
+                COALESCE((SELECT CAST(value AS INTEGER) FROM settings WHERE key = 'door_count'), ?)
+            )""", (DEFAULT_DOOR_COUNT,))
+
+        c.execute("""
+            CREATE TABLE door_v2 (
+                id INTEGER PRIMARY KEY,
+                calendar_id INTEGER NOT NULL REFERENCES calendar(id),
+                door_num INTEGER NOT NULL,
+                date_day INTEGER,
+                message TEXT,
+                image_path TEXT
+            )""")
+        c.execute("""
+            INSERT INTO door_v2(id, calendar_id, door_num, date_day, message, image_path)
+            SELECT id, 1, door_num, date_day, message, image_path FROM door""")
+        c.execute("DROP TABLE door")
+        c.execute("ALTER TABLE door_v2 RENAME TO door")
+        # every door lookup is (calendar, door): a B-tree seek whatever the
+        # number of calendars in the file
+        c.execute("CREATE UNIQUE INDEX door_calendar_num ON door(calendar_id, door_num)")
+
+        c.execute("""
+            CREATE TABLE viewer_v2 (
+                id INTEGER PRIMARY KEY,
+                calendar_id INTEGER NOT NULL REFERENCES calendar(id),
+                name TEXT
+            )""")
+        c.execute("""
+            INSERT INTO viewer_v2(calendar_id, name)
+            SELECT 1, name FROM viewer ORDER BY id DESC LIMIT 1""")
+        c.execute("DROP TABLE viewer")
+        c.execute("ALTER TABLE viewer_v2 RENAME TO viewer")
+        c.execute("CREATE UNIQUE INDEX viewer_calendar ON viewer(calendar_id)")
+
+        c.execute("DELETE FROM settings WHERE key = 'door_count'")
+        c.execute("INSERT OR REPLACE INTO settings(key, value) VALUES ('calendar_id', '1')")
+
+    def _create_message_index(self, c):
+        """
+        version 3: full-text index over door messages. The index stores no
+        copy of the text (content='door') and triggers keep it in step with
+        every insert, delete and message change, whoever writes the door.
+        prefix='2 3' makes prefix queries for words being typed an index lookup
+        """
+        c.execute("""
+            CREATE VIRTUAL TABLE door_fts USING fts5(
+                message,
+                content='door', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2',
+                prefix='2 3'
+            )""")
+        c.execute("""
+            CREATE TRIGGER door_fts_insert AFTER INSERT ON door BEGIN
+                INSERT INTO door_fts(rowid, message) VALUES (new.id, new.message);
+            END""")
+        c.execute("""
+            CREATE TRIGGER door_fts_delete AFTER DELETE ON door BEGIN
+                INSERT INTO door_fts(door_fts, rowid, message) VALUES ('delete', old.id, old.message);
+            END""")
+        # autosaves of an image alone leave the message as it was: no reindexing
+        c.execute("""
+            CREATE TRIGGER door_fts_update AFTER UPDATE OF message ON door
+            WHEN old.message IS NOT new.message BEGIN
+                INSERT INTO door_fts(door_fts, rowid, message) VALUES ('delete', old.id, old.message);
+                INSERT INTO door_fts(rowid, message) VALUES (new.id, new.message);
+            END""")
+        c.execute("INSERT INTO door_fts(door_fts) VALUES ('rebuild')")
+
+    def _create_asset_refs(self, c):
+        """
+        version 4: how many doors use each image file, kept by triggers like
+        the search index. Files nobody references any more are deleted by
+        asset_store.collect_garbage
+        """
+        c.execute("""
+            CREATE TABLE asset (
+                path TEXT PRIMARY KEY,
+                refs INTEGER NOT NULL
+            ) WITHOUT ROWID""")
+        c.execute("""
+            INSERT INTO asset(path, refs)
+            SELECT image_path, count(*) FROM door
+            WHERE image_path IS NOT NULL GROUP BY image_path""")
+        c.execute("""
+            CREATE TRIGGER door_asset_insert AFTER INSERT ON door
+            WHEN new.image_path IS NOT NULL BEGIN
+                INSERT INTO asset(path, refs) VALUES (new.image_path, 1)
+                ON CONFLICT(path) DO UPDATE SET refs = refs + 1;
+            END""")
+        c.execute("""
+            CREATE TRIGGER door_asset_delete AFTER DELETE ON door
+            WHEN old.image_path IS NOT NULL BEGIN
+                UPDATE asset SET refs = refs - 1 WHERE path = old.image_path;
+            END""")
+        c.execute("""
+            CREATE TRIGGER door_asset_update AFTER UPDATE OF image_path ON door
+            WHEN old.image_path IS NOT new.image_path BEGIN
+                UPDATE asset SET refs = refs - 1 WHERE path = old.image_path;
+                INSERT INTO asset(path, refs)
+                SELECT new.image_path, 1 WHERE new.image_path IS NOT NULL
+                ON CONFLICT(path) DO UPDATE SET refs = refs + 1;
+            END""")
+
+    def _seed_doors(self, c, calendar_id, days):
+        """
+        one row per door (no content yet), existing doors are left alone
+        """
+        c.executemany("""
+            INSERT OR IGNORE INTO door(calendar_id, door_num, date_day, message, image_path)
+            VALUES (?, ?, ?, NULL, NULL)""",
+            ((calendar_id, i, day) for i, day in enumerate(days, start=1)))
+
+    # ------------------------------ calendars ------------------------------
+    @property
+    def calendar_id(self):
+        """
+        calendar that the per-calendar methods use when no calendar_id is
+        passed. Remembered in settings so the editor reopens the same one
+        """
+        if self._shared.calendar_id is None:
+            row = self.conn.execute("""
+                SELECT id FROM calendar
+                WHERE id = (SELECT CAST(value AS INTEGER) FROM settings WHERE key = 'calendar_id')
+                UNION ALL SELECT MIN(id) FROM calendar
+                LIMIT 1""").fetchone()
+            self._shared.calendar_id = row[0] if row and row[0] is not None else self.create_calendar("Calendar 1")
+        return self._shared.calendar_id
+
+    def _calendar(self, calendar_id):
+        return self.calendar_id if calendar_id is None else calendar_id
+
+    @traced()
+    def list_calendars(self):
+        """
+        (id, title, door_count) of every calendar, ordered by id
+        """
+        return self.conn.execute("SELECT id, title, door_count FROM calendar ORDER BY id").fetchall()
 
-    def set_viewer_name(self, name: str):
+    @traced()
+    def create_calendar(self, title: str, door_count: int = DEFAULT_DOOR_COUNT):
         """
-        changes user's name in db from input
+        adds an empty calendar with its doors and returns its id
+        (the current calendar does not change)
         """
         c = self.conn.cursor()
-        c.execute("DELETE FROM viewer")
-        c.execute("INSERT INTO viewer(name) VALUES (?)", (name,))
-        self.conn.commit()
+        c.execute("INSERT INTO calendar(title, door_count) VALUES (?, ?)", (title, door_count))
+        calendar_id = c.lastrowid
+        self._seed_doors(c, calendar_id, door_dates(door_count))
+        self._commit()
+        return calendar_id
+
+    @traced()
+    def select_calendar(self, calendar_id: int):
+        """
+        switch the current calendar; every repo on this connection follows
+        """
+        if self.conn.execute("SELECT 1 FROM calendar WHERE id = ?", (calendar_id,)).fetchone() is None:
+            raise ValueError(f"no calendar with id {calendar_id}")
+        self._shared.calendar_id = calendar_id
+        self.conn.execute("INSERT OR REPLACE INTO settings(key, value) VALUES ('calendar_id', ?)",
+                          (str(calendar_id),))
+        self._commit()
 
-    def get_door(self, door_num: int):
+    @traced()
+    def set_viewer_name(self, name: str, calendar_id=None):
+        """
+        changes user's name in db from input; also used as the calendar title
+        """
+        calendar_id = self._calendar(calendar_id)
+        c = self.conn.cursor()
+        c.execute("""
+            INSERT INTO viewer(calendar_id, name) VALUES (?, ?)
+            ON CONFLICT(calendar_id) DO UPDATE SET name = excluded.name""",
+            (calendar_id, name))
+        c.execute("UPDATE calendar SET title = ? WHERE id = ?", (name, calendar_id))
+        self._commit()
+
+    @traced()
+    def get_viewer_name(self, calendar_id=None):
+        """
+        name the calendar is for, or None if not set yet
+        """
+        row = self.conn.execute("SELECT name FROM viewer WHERE calendar_id = ?",
+                                (self._calendar(calendar_id),)).fetchone()
+        return row[0] if row else None
+
+    # ------------------------------ doors ------------------------------
+    @traced()
+    def get_door(self, door_num: int, calendar_id=None):
         """
         gets data associated with door
         """
         c = self.conn.cursor()
-        c.execute("SELECT message, image_path FROM door WHERE door_num = ?", (door_num,))
+        c.execute("SELECT message, image_path FROM door WHERE calendar_id = ? AND door_num = ?",
+                  (self._calendar(calendar_id), door_num))
         return c.fetchone()
 
-    def update_door(self, door_num: int, message: str, img_path: str):
+    @traced()
+    def get_doors(self, door_range: range, calendar_id=None):
+        """
+        DoorRecords for a block of doors in one query,
+        used by the door grid to load one page at a time
+        """
+        c = self.conn.cursor()
+        c.execute("""
+            SELECT door_num, date_day, message, image_path FROM door
+            WHERE calendar_id = ? AND door_num BETWEEN ? AND ?
+            ORDER BY door_num""",
+            (self._calendar(calendar_id), door_range.start, door_range.stop - 1))
+        return [DoorRecord._make(row) for row in c]
+
+    @traced()
+    def get_all_doors(self, calendar_id=None):
+        """
+        every door of the calendar as a DoorRecord, in one query
+        """
+        c = self.conn.cursor()
+        c.execute("""
+            SELECT door_num, date_day, message, image_path FROM door
+            WHERE calendar_id = ? ORDER BY door_num""",
+            (self._calendar(calendar_id),))
+        return [DoorRecord._make(row) for row in c]
+
+    @traced()
+    def get_door_count(self, calendar_id=None):
+        """
+        number of doors in the calendar (12 unless changed)
+        """
+        c = self.conn.cursor()
+        c.execute("SELECT door_count FROM calendar WHERE id = ?", (self._calendar(calendar_id),))
+        row = c.fetchone()
+        return row[0] if row else DEFAULT_DOOR_COUNT
+
+    @traced()
+    def set_door_count(self, door_count: int, calendar_id=None):
+        """
+        resize the calendar: adds missing doors and re-dates all of them.
+        Doors past the new count keep their content but are hidden
+        """
+        calendar_id = self._calendar(calendar_id)
+        c = self.conn.cursor()
+        days = door_dates(door_count)
+        self._seed_doors(c, calendar_id, days)
+        c.executemany("UPDATE door SET date_day = ? WHERE calendar_id = ? AND door_num = ?",
+                      ((day, calendar_id, i) for i, day in enumerate(days, start=1)))
+        c.execute("UPDATE calendar SET door_count = ? WHERE id = ?", (door_count, calendar_id))
+        self._commit()
+
+    @traced()
+    def update_door(self, door_num: int, message: str, img_path: str, calendar_id=None):
         """
         adds image to correct door
         """
@@ -71,9 +445,224 @@ class SqliteRepo:
         c.execute("""
             UPDATE door
             SET message = ?, image_path = ?
-            WHERE door_num = ?""",
-            (message, img_path, door_num))
+            WHERE calendar_id = ? AND door_num = ?""",
+            (message, img_path, self._calendar(calendar_id), door_num))
+        self._commit()
+
+    @traced()
+    def update_doors(self, doors, calendar_id=None):
+        """
+        write many doors at once: iterable of (door_num, message, img_path).
+        All rows go in one executemany and one commit
+        """
+        calendar_id = self._calendar(calendar_id)
+        c = self.conn.cursor()
+        c.executemany("""
+            UPDATE door
+            SET message = ?, image_path = ?
+            WHERE calendar_id = ? AND door_num = ?""",
+            ((message, img_path, calendar_id, door_num) for door_num, message, img_path in doors))
+        self._commit()
+
+    # ------------------------------ search ------------------------------
+    @traced()
+    def search(self, query: str, limit: int = 20, calendar_id=None, mark=("[", "]")):
+        """
+        shown doors whose message matches every word of query, best match first
+        (newest first past RANKED_MATCHES), as SearchHits from all calendars
+        or only calendar_id. The snippet is a few words around the match with
+        the matched words wrapped in mark
+        """
+        match = _fts_query(query)
+        if not match:
+            return []
+        matches = self.conn.execute(
+            "SELECT count(*) FROM (SELECT 1 FROM door_fts WHERE door_fts MATCH ? LIMIT ?)",
+            (match, RANKED_MATCHES + 1)).fetchone()[0]
+        order = "rank" if matches <= RANKED_MATCHES else "door_fts.rowid DESC"
+        sql = """
+            SELECT door.calendar_id, calendar.title, door.door_num,
+                   snippet(door_fts, 0, ?, ?, '…', 10)
+            FROM door_fts
+            JOIN door ON door.id = door_fts.rowid
+            JOIN calendar ON calendar.id = door.calendar_id
+            WHERE door_fts MATCH ? AND door.door_num <= calendar.door_count"""
+        params = [mark[0], mark[1], match]
+        if calendar_id is not None:
+            sql += " AND door.calendar_id = ?"
+            params.append(calendar_id)
+        sql += f" ORDER BY {order} LIMIT ?"
+        params.append(limit)
+        return [SearchHit._make(row) for row in self.conn.execute(sql, params)]
+
+    # ------------------------------ assets ------------------------------
+    @traced()
+    def referenced_assets(self):
+        """
+        absolute paths of the image files at least one door uses
+        (relative paths are taken from the database folder)
+        """
+        base = os.path.dirname(self.db_path)
+        rows = self.conn.execute("SELECT path FROM asset WHERE refs > 0")
+        return {os.path.normpath(os.path.join(base, path)) for path, in rows}
+
+    @traced()
+    def unreferenced_assets(self):
+        """
+        (path as stored, absolute path) of image files no door uses any more
+        """
+        base = os.path.dirname(self.db_path)
+        rows = self.conn.execute("SELECT path FROM asset WHERE refs <= 0")
+        return [(path, os.path.normpath(os.path.join(base, path))) for path, in rows]
+
+    @traced()
+    def forget_asset(self, path):
+        """
+        drop the count of a file that was deleted, unless a door uses it again
+        """
+        self.conn.execute("DELETE FROM asset WHERE path = ? AND refs <= 0", (path,))
+        self._commit()
+
+    # ------------------------------ import / export ------------------------------
+    @traced()
+    def export_doors(self, path, calendar_id=None):
+        """
+        write the calendar's doors to path as JSON Lines (CSV for *.csv),
+        streamed from the cursor. Doors past the door count are left out, as
+        import_doors would skip them. Image paths are written relative to
+        the file. Returns the number of doors written
+        """
+        base = os.path.dirname(os.path.abspath(path))
+        rows = self.conn.execute("""
+            SELECT door_num, message, image_path FROM door
+            WHERE calendar_id = ?1
+              AND door_num <= (SELECT door_count FROM calendar WHERE id = ?1)
+            ORDER BY door_num""",
+            (self._calendar(calendar_id),))
+        count = 0
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            if _is_csv(path):
+                writer = csv.writer(f)
+                writer.writerow(DOOR_FIELDS)
+                write = writer.writerow
+            else:
+                def write(row):
+                    f.write(json.dumps(dict(zip(DOOR_FIELDS, row)), ensure_ascii=False) + "\n")
+            for door_num, message, image_path in rows:
+                write((door_num, message, self._image_ref_out(image_path, base)))
+                count += 1
+        return count
+
+    def _image_ref_out(self, image_path, base):
+        if not image_path:
+            return None
+        if not os.path.isabs(image_path):
+            image_path = os.path.join(os.path.dirname(self.db_path), image_path)
+        try:
+            return os.path.relpath(image_path, base).replace(os.sep, "/")
+        except ValueError:
+            return image_path  # on another drive (windows)
+
+    @traced()
+    def import_doors(self, path, resolve_image=None, calendar_id=None):
+        """
+        read doors from a file written by export_doors and store them in
+        one transaction. Image paths are taken relative to the file, then
+        resolve_image(door_num, path) may swap them (e.g. for an ingested
+        copy); that happens while reading, before the transaction opens, so
+        slow image work never holds the write lock. Doors the calendar
+        doesn't have (past its door count) are skipped. Returns the number
+        of doors imported
+        """
+        base = os.path.dirname(os.path.abspath(path))
+        calendar_id = self._calendar(calendar_id)
+        days = door_dates(self.get_door_count(calendar_id))
+        rows = []
+        with open(path, encoding="utf-8-sig", newline="") as f:
+            records = csv.DictReader(f) if _is_csv(path) else (json.loads(line) for line in f if line.strip())
+            for line, record in enumerate(records, start=1):
+                try:
+                    door_num = int(record["door_num"])
+                except (KeyError, TypeError, ValueError):
+                    raise ValueError(f"{path}: record {line} has no valid door_num") from None
+                if not 1 <= door_num <= len(days):
+                    continue
+                image = record.get("image") or None
+                if image:
+                    image = os.path.normpath(os.path.join(base, image))
+                    if resolve_image is not None:
+                        image = resolve_image(door_num, image)
+                rows.append((calendar_id, door_num, days[door_num - 1], record.get("message") or None, image))
+
+        with self.batch():
+            # doors are seeded with their dates, the date only matters if one is missing
+            self.conn.executemany("""
+                INSERT INTO door(calendar_id, door_num, date_day, message, image_path)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(calendar_id, door_num) DO UPDATE
+                SET message = excluded.message, image_path = excluded.image_path""",
+                rows)
+        return len(rows)
+
+    @traced()
+    def export_calendar_db(self, dest_path, calendar_id=None):
+        """
+        write one calendar to a new database file in the single calendar
+        layout (viewer, door, settings.door_count) that the viewer reads.
+        Doors past the door count are left out
+        """
+        calendar_id = self._calendar(calendar_id)
+        if os.path.exists(dest_path):
+            os.remove(dest_path)
+        # ATTACH is not allowed inside a transaction
         self.conn.commit()
+        self.conn.execute("ATTACH DATABASE ? AS export", (dest_path,))
+        try:
+            c = self.conn.cursor()
+            c.execute("PRAGMA export.journal_mode=DELETE")
+            c.execute("CREATE TABLE export.viewer (id INTEGER PRIMARY KEY, name TEXT)")
+            c.execute("""
+                CREATE TABLE export.door (
+                    id INTEGER PRIMARY KEY,
+                    door_num INTEGER UNIQUE,
+                    date_day INTEGER,
+                    message TEXT,
+                    image_path TEXT
+                )""")
+            c.execute("CREATE TABLE export.settings (key TEXT PRIMARY KEY, value TEXT)")
+            c.execute("INSERT INTO export.viewer(name) SELECT name FROM viewer WHERE calendar_id = ?",
+                      (calendar_id,))
+            c.execute("""
+                INSERT INTO export.door(door_num, date_day, message, image_path)
+                SELECT door_num, date_day, message, image_path FROM door
+                WHERE calendar_id = ?1
+                  AND door_num <= (SELECT door_count FROM calendar WHERE id = ?1)
+                ORDER BY door_num""",
+                (calendar_id,))
+            c.execute("""
+                INSERT INTO export.settings(key, value)
+                SELECT 'door_count', door_count FROM calendar WHERE id = ?""",
+                (calendar_id,))
+            c.execute("PRAGMA export.user_version = 1")
+            self.conn.commit()
+        finally:
+            self.conn.execute("DETACH DATABASE export")
 
     def close(self):
-        self.conn.close()
+        """
+        release this repo; the shared connection closes with the last one
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._shared.refs -= 1
+        if self._shared.refs <= 0:
+            if not self._private:
+                _connections.pop(self.db_path, None)
+            self._shared.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -1,37 +1,72 @@
 import os
-import shutil
 import tkinter as tk
-from tkinter import filedialog, messagebox
 from tkinter.scrolledtext import ScrolledText
 
-from config import ASSETS_DIR, PEACH
+from config import (
+    ASSETS_DIR,
+    ORIGINALS_DIR,
+    KEEP_ORIGINAL_UPLOADS,
+    PEACH,
+    AUTOSAVE_DELAY_MS
+)
+import image_cache
 from ui_helpers import round_rect, pill
 from database import SqliteRepo
+from asset_store import in_store
+from tracing import traced
 
 
 class DoorEditor(tk.Frame):
     """
-    door class to create each door window and attach reltated information
+    door class to create each door window and attach reltated information.
+    Built once by the editor and reused for every door through show_door()
     """
-    def __init__(self, master, door_num):
+    def __init__(self, master, app):
         super().__init__(master, bg="white")
-        self.master = master
-        self.door_num = door_num
+        self.app = app
+        self.door_num = None
+        self.calendar_id = None
         self.repo = SqliteRepo()
+        self._autosave_id = None
+        self._loading = False
 
-        self.pack(expand=True, fill="both")
         self._build_ui()
+        self.msg_text.bind("<<Modified>>", self._on_text_modified)
+        self.img_var.trace_add("write", self._on_edit)
+
+    def flush_pending(self):
+        """
+        write out an edit still waiting for its autosave timer
+        """
+        if self._autosave_id is not None:
+            self.after_cancel(self._autosave_id)
+            self.autosave()
+
+    def destroy(self):
+        self.flush_pending()
+        self.repo.close()
+        super().destroy()
+
+    def show_door(self, door_num):
+        """
+        point the editor at another door and reload its data
+        """
+        self.flush_pending()
+        self.door_num = door_num
+        self.calendar_id = self.repo.calendar_id
+        self.canvas.itemconfigure(self.title_id, text=f"DOOR {door_num}")
         self.load_data()
 
     # ------------------------------ UI ------------------------------
     def _build_ui(self):
         canvas = tk.Canvas(self, width=760, height=500, bg="white", highlightthickness=0)
         canvas.pack(pady=20)
+        self.canvas = canvas
 
         round_rect(canvas, 10, 10, 750, 480, r=45, fill=PEACH)
 
-        canvas.create_text(
-            380, 50, text=f"DOOR {self.door_num}",
+        self.title_id = canvas.create_text(
+            380, 50, text="DOOR",
             font=("Georgia", 24, "bold"), fill="white"
         )
 
@@ -76,6 +111,8 @@ class DoorEditor(tk.Frame):
         """
         Browse files to find an image to upload for door
         """
+        from tkinter import filedialog
+
         file = filedialog.askopenfilename(
             filetypes=[
                 ("Image files", "*.png *.jpg *.jpeg *.gif *.bmp")
@@ -87,31 +124,120 @@ class DoorEditor(tk.Frame):
     # ------------------------------ DB ------------------------------
     def load_data(self):
         """
-        get data related to door from db
+        get data related to door from db (or the autosave still waiting to be written)
         """
-        message, img = self.repo.get_door(self.door_num)
+        pending = self.app.writer.pending_state(("door", self.calendar_id, self.door_num))
+        message, img = pending or self.repo.get_door(self.door_num, calendar_id=self.calendar_id)
+        self._loading = True
+        self.msg_text.delete("1.0", tk.END)
+        self.img_var.set("")
         if message:
             self.msg_text.insert("1.0", message)
         if img:
             self.img_var.set(img)
+        self.msg_text.edit_modified(False)
+        self._loading = False
 
-    def save(self):
+    def _on_text_modified(self, event):
+        # <<Modified>> also fires when the flag is cleared, ignore that one
+        if not self.msg_text.edit_modified():
+            return
+        self.msg_text.edit_modified(False)
+        self._on_edit()
+
+    def _on_edit(self, *args):
+        """
+        restart the autosave timer whenever the message or image changes
         """
-        take information from user and store in db
+        if self._loading or self.door_num is None:
+            return
+        if self._autosave_id is not None:
+            self.after_cancel(self._autosave_id)
+        self._autosave_id = self.after(AUTOSAVE_DELAY_MS, self.autosave)
+
+    @traced()
+    def autosave(self):
         """
+        queue the current message and image for the background writer
+        """
+        self._autosave_id = None
         message = self.msg_text.get("1.0", tk.END).strip() or None
         img_path = self.img_var.get().strip() or None
+        # the calendar is captured too: the user may switch before it is written
+        calendar_id, door_num = self.calendar_id, self.door_num
+        self.app.writer.submit(
+            ("door", calendar_id, door_num),
+            lambda repo: write_door(repo, calendar_id, door_num, message, img_path),
+            state=(message, img_path),
+            on_done=lambda result, error: self._on_saved(calendar_id, door_num, img_path, result, error)
+        )
 
-        if img_path and os.path.exists(img_path):
-            ext = os.path.splitext(img_path)[1]
-            dest = os.path.join(ASSETS_DIR, f"door{self.door_num}{ext}")
+    def _on_saved(self, calendar_id, door_num, img_path, stored_path, error):
+        """
+        runs on the Tk thread once the writer thread finished a door
+        """
+        if error is not None:
+            self.app.set_status(f"Door {door_num} could not be saved: {error}")
+            return
+        # stored_path is None if the image was cleared or the typed path isn't
+        # an image (yet); the entry then stays as typed
+        if stored_path is not None:
+            image_cache.shared_cache().invalidate(stored_path)
+            # point the entry at the copy in assets, unless the user changed it since
+            if (calendar_id, door_num) == (self.calendar_id, self.door_num) and self.img_var.get().strip() == img_path:
+                self._loading = True
+                self.img_var.set(stored_path)
+                self._loading = False
+        self.app.on_door_saved(calendar_id, door_num)
+
+    @traced()
+    def save(self):
+        """
+        take information from user and store in db (written in the background)
+        """
+        if self._autosave_id is not None:
+            self.after_cancel(self._autosave_id)
+        self.autosave()
+        self.app.set_status(f"Saving door {self.door_num}...")
+        self.app.show_doors_page()
 
-            if os.path.exists(dest):
-                os.remove(dest)
 
-            shutil.copy(img_path, dest)
-            img_path = dest
+@traced()
+def write_door(repo, calendar_id, door_num, message, img_path):
+    """
+    ingests the door image into assets (resized, re-encoded) and stores the
+    door; runs on the writer thread. The message is always saved, the image
+    only once img_path is empty or an image file: a half typed path leaves
+    the door's image as it was. Returns the stored image path, None if the
+    image was left alone or cleared
+    """
+    stored_path = store_door_image(img_path) if img_path else None
+    if img_path and stored_path is None:
+        row = repo.get_door(door_num, calendar_id=calendar_id)
+        img_path = row[1] if row else None
+    else:
+        img_path = stored_path
+    repo.update_door(door_num, message, img_path, calendar_id=calendar_id)
+    return stored_path
+
 
-        self.repo.update_door(self.door_num, message, img_path)
-        messagebox.showinfo("Saved", f"Door {self.door_num} saved.")
-        self.master.show_doors_page()
+def store_door_image(img_path):
+    """
+    path of the door's image in the asset store, ingesting it first unless
+    it already is a stored copy (then nothing is read or written). None if
+    img_path is not an image file (missing, a folder, not decodable)
+    """
+    if not img_path or not os.path.isfile(img_path):
+        return None
+    if in_store(img_path, ASSETS_DIR):
+        return img_path
+    from PIL import Image
+    from ingest import ingest_image  # PIL's ImageOps, only needed on upload
+
+    try:
+        return ingest_image(
+            img_path, ASSETS_DIR,
+            keep_original_dir=ORIGINALS_DIR if KEEP_ORIGINAL_UPLOADS else None
+        )
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return None
@@ -0,0 +1,281 @@
+"""
+Door grid drawn on a single canvas, shared by the editor and the viewer.
+
+Only the doors inside the visible viewport exist as canvas items. Scrolling
+moves the same item groups ("slots") to the doors that came into view, so the
+grid costs the same to build for 12 doors as for 365.
+"""
+import math
+import tkinter as tk
+
+from ui_helpers import round_rect
+
+# doors per metadata page requested from load_page
+PAGE_SIZE = 32
+# room left for a preview image inside a door (at scale 1)
+THUMB_BOX = (120, 80)
+
+
+def grid_shape(door_count, max_cols=None):
+    """
+    (rows, cols) for a calendar: roughly 4:3, so 12 doors -> 3 x 4
+    """
+    cols = max(1, min(door_count, math.ceil(math.sqrt(door_count * 4 / 3))))
+    if max_cols:
+        cols = min(cols, max_cols)
+    rows = max(1, math.ceil(door_count / cols))
+    return rows, cols
+
+
+class DoorGrid(tk.Frame):
+    """
+    Scrollable canvas of doors. Each visible door is a group of items tagged
+    "door" and "slot{k}"; clicks are resolved from the item under the cursor.
+
+    load_page(range) -> {door_num: info} is called once per PAGE_SIZE block of
+    doors as they scroll into view; info["badge"] is drawn in the door corner.
+    Optional previews: info["thumb"] (a PhotoImage fitting thumb_box), info["thumb_pending"]
+    (draws a placeholder until update_info hands the thumb over) and
+    info["snippet"] (a short line of text under the thumb).
+    """
+
+    def __init__(self, master, door_count, on_click, bg, fill,
+                 door_size=180, padx=15, pady=15, outline="",
+                 visible_rows=3, max_cols=4, load_page=None):
+        super().__init__(master, bg=bg)
+        self.on_click = on_click
+        self.load_page = load_page
+        self._base = (door_size, padx, pady)
+        self.scale = 1.0
+        self.door_size = door_size
+        self.padx = padx
+        self.pady = pady
+        self.fill = fill
+        self.outline = outline
+        self.visible_rows = visible_rows
+        self.max_cols = max_cols
+
+        self.canvas = tk.Canvas(self, bg=bg, highlightthickness=0,
+                                yscrollincrement=self.cell_h // 3)
+        self.canvas.pack(side="left")
+        self.scrollbar = tk.Scrollbar(self, orient="vertical", command=self._yview)
+        self.canvas.configure(yscrollcommand=self.scrollbar.set)
+
+        self._slots = []           # slot index -> door_num shown (or None)
+        self._origins = []         # slot index -> top-left corner of its items
+        self._door_slots = {}      # door_num -> slot index
+        self._pages = {}           # page index -> {door_num: info}
+
+        self.canvas.bind("<Button-1>", self._on_click)
+        self.canvas.bind("<MouseWheel>", self._on_wheel)
+        self.canvas.bind("<Button-4>", lambda e: self._scroll(-1))
+        self.canvas.bind("<Button-5>", lambda e: self._scroll(1))
+
+        self.set_door_count(door_count)
+
+    # ------------------------------ layout ------------------------------
+    @property
+    def cell_w(self):
+        return self.door_size + 2 * self.padx
+
+    @property
+    def cell_h(self):
+        return self.door_size + 2 * self.pady
+
+    @property
+    def thumb_box(self):
+        """size previews should have at the current scale"""
+        return tuple(round(v * self.scale) for v in THUMB_BOX)
+
+    def set_door_count(self, door_count):
+        """
+        resize the grid for a calendar with door_count doors
+        """
+        self.door_count = door_count
+        self.rows, self.cols = grid_shape(door_count, self.max_cols)
+        shown_rows = min(self.rows, self.visible_rows)
+        width = self.cols * self.cell_w
+        self.canvas.configure(
+            width=width, height=shown_rows * self.cell_h,
+            scrollregion=(0, 0, width, self.rows * self.cell_h)
+        )
+        if self.rows > self.visible_rows:
+            self.scrollbar.pack(side="right", fill="y")
+        else:
+            self.scrollbar.pack_forget()
+        self.canvas.yview_moveto(0)
+        self.refresh()
+
+    def set_scale(self, scale):
+        """
+        redraw with doors scale times their base size (window resized)
+        """
+        if scale == self.scale:
+            return
+        self.scale = scale
+        self.door_size, self.padx, self.pady = (round(v * scale) for v in self._base)
+        self.canvas.delete("door")
+        self._slots = []
+        self._origins = []
+        self._door_slots = {}
+        self.canvas.configure(yscrollincrement=self.cell_h // 3)
+        self.set_door_count(self.door_count)
+
+    def _font(self, size, weight="bold"):
+        return ("Georgia", round(size * self.scale), weight)
+
+    def door_origin(self, door_num):
+        """top-left corner of the door's cell"""
+        r, c = divmod(door_num - 1, self.cols)
+        return (c * self.cell_w + self.padx, r * self.cell_h + self.pady)
+
+    def visible_doors(self):
+        """range of door numbers inside the viewport"""
+        top = self.canvas.canvasy(0)
+        first_row = max(0, int(top // self.cell_h))
+        last_row = first_row + self.visible_rows  # one extra for partial rows
+        first = first_row * self.cols + 1
+        last = min(self.door_count, (last_row + 1) * self.cols)
+        return range(first, last + 1)
+
+    # ------------------------------ slots ------------------------------
+    def _new_slot(self):
+        k = len(self._slots)
+        s = self.door_size
+        tags = ("door", f"slot{k}")
+        m = round(10 * self.scale)
+        round_rect(self.canvas, m, m, s - m, s - m, r=round(40 * self.scale),
+                   fill=self.fill, outline=self.outline, tags=tags)
+        self.canvas.create_text(s / 2, s / 2, text="", fill="white",
+                                font=self._font(32),
+                                tags=tags + (f"num{k}",))
+        self.canvas.create_text(s - 2.4 * m, 3 * m, text="", fill="white",
+                                font=self._font(14),
+                                tags=tags + (f"badge{k}",))
+        # preview: placeholder frame, thumbnail and message snippet
+        tw, th = self.thumb_box
+        self.canvas.create_rectangle(s / 2 - tw / 2, s / 2 + 2 - th / 2,
+                                     s / 2 + tw / 2, s / 2 + 2 + th / 2,
+                                     outline="white", dash=(4, 4), state="hidden",
+                                     tags=tags + (f"ph{k}",))
+        self.canvas.create_image(s / 2, s / 2 + 2, tags=tags + (f"thumb{k}",))
+        self.canvas.create_text(s / 2, s - 3.4 * m, text="", fill="white",
+                                font=self._font(10, "normal"), width=s - 4 * m,
+                                tags=tags + (f"snip{k}",))
+        self._slots.append(None)
+        self._origins.append((0, 0))
+        return k
+
+    def _place(self, k, door_num):
+        """move slot k onto door_num"""
+        x, y = self.door_origin(door_num)
+        ox, oy = self._origins[k]
+        self.canvas.move(f"slot{k}", x - ox, y - oy)
+        self._origins[k] = (x, y)
+        self.canvas.itemconfigure(f"num{k}", text=str(door_num))
+        self.canvas.itemconfigure(f"slot{k}", state="normal")
+        self._slots[k] = door_num
+        self._door_slots[door_num] = k
+        self._decorate(k, door_num)
+
+    def _decorate(self, k, door_num):
+        info = self.door_info(door_num) or {}
+        self.canvas.itemconfigure(f"badge{k}", text=info.get("badge", ""))
+
+        thumb = info.get("thumb")
+        pending = info.get("thumb_pending", False) and thumb is None
+        snippet = info.get("snippet", "")
+        # with a preview the number moves up out of the way
+        x, y = self._origins[k]
+        s = self.door_size
+        preview = thumb is not None or pending or snippet
+        self.canvas.coords(f"num{k}", x + s / 2, y + (32 * self.scale if preview else s / 2))
+        self.canvas.itemconfigure(f"num{k}", font=self._font(20 if preview else 32))
+        self.canvas.itemconfigure(f"thumb{k}", image=thumb or "")
+        self.canvas.itemconfigure(f"ph{k}", state="normal" if pending else "hidden")
+        self.canvas.itemconfigure(f"snip{k}", text=snippet)
+
+    def _update_visible(self):
+        wanted = self.visible_doors()
+        self._load_pages(wanted)
+
+        # free slots that scrolled out of view
+        free = []
+        for k, door_num in enumerate(self._slots):
+            if door_num is None or door_num not in wanted:
+                if door_num is not None:
+                    del self._door_slots[door_num]
+                self._slots[k] = None
+                free.append(k)
+
+        for door_num in wanted:
+            if door_num in self._door_slots:
+                continue
+            k = free.pop() if free else self._new_slot()
+            self._place(k, door_num)
+
+        for k in free:
+            self.canvas.itemconfigure(f"slot{k}", state="hidden")
+
+    def refresh(self):
+        """
+        drop cached door metadata and redraw the visible doors
+        """
+        self._pages.clear()
+        self._door_slots.clear()
+        self._slots = [None] * len(self._slots)
+        self._update_visible()
+
+    # ------------------------------ metadata ------------------------------
+    def _load_pages(self, doors):
+        if self.load_page is None or not doors:
+            return
+        for page in range((doors.start - 1) // PAGE_SIZE, (doors.stop - 2) // PAGE_SIZE + 1):
+            if page not in self._pages:
+                first = page * PAGE_SIZE + 1
+                last = min(self.door_count, first + PAGE_SIZE - 1)
+                self._pages[page] = self.load_page(range(first, last + 1))
+
+    def door_info(self, door_num):
+        page = self._pages.get((door_num - 1) // PAGE_SIZE)
+        return page.get(door_num) if page else None
+
+    def update_info(self, door_num, **changes):
+        """
+        change a door's metadata after load_page (e.g. a thumbnail that was
+        made in the background) and redraw it if it is on screen
+        """
+        page = self._pages.get((door_num - 1) // PAGE_SIZE)
+        if page is None:
+            return
+        page.setdefault(door_num, {}).update(changes)
+        k = self._door_slots.get(door_num)
+        if k is not None:
+            self._decorate(k, door_num)
+
+    # ------------------------------ events ------------------------------
+    def _yview(self, *args):
+        self.canvas.yview(*args)
+        self._update_visible()
+
+    def _scroll(self, units):
+        if self.rows > self.visible_rows:
+            self._yview("scroll", units, "units")
+
+    def _on_wheel(self, event):
+        self._scroll(-1 if event.delta > 0 else 1)
+
+    def door_at(self, x, y):
+        """
+        door number under canvas point (x, y), or None
+        """
+        for item in reversed(self.canvas.find_overlapping(x, y, x, y)):
+            for tag in self.canvas.gettags(item):
+                if tag.startswith("slot") and self._slots[int(tag[4:])] is not None:
+                    return self._slots[int(tag[4:])]
+        return None
+
+    def _on_click(self, event):
+        door_num = self.door_at(self.canvas.canvasx(event.x), self.canvas.canvasy(event.y))
+        if door_num is not None:
+            self.on_click(door_num)
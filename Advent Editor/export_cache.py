@@ -0,0 +1,202 @@
+"""
+Content hashes for incremental exports.
+
+HashCache remembers the sha256 of every source file (rehashed only when its
+size or mtime changes). ExportManifest records what was last written into an
+export folder, so a re-export only rewrites files whose content changed, and
+copy_file places each file as cheaply as the file system allows. Both live
+in the export cache, nothing extra goes into the folder sent to recipients.
+"""
+import hashlib
+import json
+import os
+import shutil
+import sys
+from collections import Counter
+
+try:
+    import fcntl
+except ImportError:  # windows
+    fcntl = None
+
+# where manifests used to be kept, inside the export folder itself
+LEGACY_MANIFEST_NAME = ".export_manifest.json"
+
+# ioctl cloning a whole file on btrfs / xfs / overlay (linux/fs.h)
+FICLONE = 0x40049409
+
+
+def sha256_file(path, chunk_size=1024 * 1024):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def copy_file(src, dest, link=False):
+    """
+    give dest the content of src without moving the bytes through Python:
+    a hard link (link=True, only for files that are never changed in place),
+    a reflink (copy-on-write clone), os.copy_file_range (copied inside the
+    kernel) or else a regular copy. Returns which one was used
+    """
+    if link:
+        try:
+            os.link(src, dest)
+            return "linked"
+        except OSError:
+            pass  # other drive, or a file system without hard links
+    with open(src, "rb") as fsrc, open(dest, "wb") as fdst:
+        if fcntl is not None and sys.platform.startswith("linux"):
+            try:
+                fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+                return "cloned"
+            except OSError:
+                pass
+        if hasattr(os, "copy_file_range"):
+            try:
+                remaining = os.fstat(fsrc.fileno()).st_size
+                while remaining > 0:
+                    n = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                    if n == 0:
+                        break
+                    remaining -= n
+                if remaining == 0:
+                    return "copied in kernel"
+            except OSError:
+                pass
+    shutil.copyfile(src, dest)
+    return "copied"
+
+
+def _load_json(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_json(path, data):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+class HashCache:
+    """
+    path -> sha256, persisted in cache_dir/hashes.json and keyed on
+    (size, mtime) so unchanged files are never read twice
+    """
+
+    def __init__(self, cache_dir):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, "hashes.json")
+        self._entries = _load_json(self.path)
+        self._dirty = False
+
+    def digest(self, path):
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        stamp = [st.st_size, st.st_mtime_ns]
+        entry = self._entries.get(path)
+        if entry and entry[:2] == stamp:
+            return entry[2]
+        digest = sha256_file(path)
+        self._entries[path] = stamp + [digest]
+        self._dirty = True
+        return digest
+
+    def save(self):
+        if self._dirty:
+            _save_json(self.path, self._entries)
+            self._dirty = False
+
+
+class ExportManifest:
+    """
+    relative path -> sha256 of each file placed in an export folder, saved
+    in manifest_dir under a name made from the folder's path
+    """
+
+    def __init__(self, dest_folder, manifest_dir):
+        self.dest_folder = dest_folder
+        self.path = self.path_for(dest_folder, manifest_dir)
+        self._legacy_path = os.path.join(dest_folder, LEGACY_MANIFEST_NAME)
+        self.old = _load_json(self.path) or _load_json(self._legacy_path)
+        self.files = {}
+        self.written = 0
+        self.skipped = 0
+        self.methods = Counter()  # copy_file result -> files placed that way
+
+    @staticmethod
+    def path_for(dest_folder, manifest_dir):
+        folder = os.path.normcase(os.path.abspath(dest_folder))
+        return os.path.join(manifest_dir, hashlib.sha256(folder.encode()).hexdigest() + ".json")
+
+    @classmethod
+    def exists_for(cls, folder, manifest_dir):
+        """true if folder is an earlier export"""
+        return (os.path.exists(cls.path_for(folder, manifest_dir))
+                or os.path.exists(os.path.join(folder, LEGACY_MANIFEST_NAME)))
+
+    def place(self, src, rel, digest, link=False):
+        """
+        copy src to dest_folder/rel unless the same content is already there.
+        link=True allows a hard link (see copy_file)
+        """
+        dest = os.path.join(self.dest_folder, rel)
+        self.files[rel] = digest
+        if self.old.get(rel) == digest and os.path.exists(dest):
+            self.skipped += 1
+            return False
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        if os.path.isdir(src):
+            shutil.rmtree(dest, ignore_errors=True)
+            shutil.copytree(src, dest)
+        else:
+            tmp = dest + ".partial"
+            if os.path.lexists(tmp):
+                os.remove(tmp)
+            method = copy_file(src, tmp, link)
+            if method != "linked":
+                shutil.copymode(src, tmp)
+            os.replace(tmp, dest)
+            self.methods[method] += 1
+        self.written += 1
+        return True
+
+    def record(self, rel, digest):
+        """note a file that was written directly (e.g. generated scripts)"""
+        self.files[rel] = digest
+
+    def remove_stale(self):
+        """delete files from the previous export that are no longer part of it"""
+        for rel in set(self.old) - set(self.files):
+            target = os.path.join(self.dest_folder, rel)
+            if os.path.isdir(target):
+                shutil.rmtree(target, ignore_errors=True)
+            elif os.path.exists(target):
+                os.remove(target)
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        _save_json(self.path, self.files)
+        if os.path.exists(self._legacy_path):
+            os.remove(self._legacy_path)
+
+
+def build_key(hash_cache, src_files, *extra):
+    """
+    cache key for a PyInstaller build: hashes of the viewer sources plus
+    anything else the output depends on (platform, python, pyinstaller)
+    """
+    h = hashlib.sha256()
+    for path in sorted(src_files):
+        h.update(os.path.basename(path).encode())
+        h.update(hash_cache.digest(path).encode())
+    for item in extra:
+        h.update(str(item).encode())
+    return h.hexdigest()[:24]
@@ -0,0 +1,94 @@
+"""
+Progress window for a running export.
+"""
+import tkinter as tk
+from tkinter import ttk, messagebox
+from tkinter.scrolledtext import ScrolledText
+
+from config import PEACH
+
+
+class ExportDialog(tk.Toplevel):
+    """
+    Shows the current stage, a progress bar and the streamed build log of an
+    ExportJob. Polls the job's events with after() so the editor stays usable.
+    """
+
+    def __init__(self, master, job):
+        super().__init__(master, bg="white")
+        self.title("Exporting calendar")
+        self.geometry("640x420")
+        self.job = job
+
+        self.stage_var = tk.StringVar(value="Starting…")
+        tk.Label(self, textvariable=self.stage_var, bg="white", fg=PEACH,
+                 font=("Georgia", 16, "bold")).pack(pady=(12, 6))
+
+        self.progress = ttk.Progressbar(self, maximum=len(job.stages), length=560)
+        self.progress.pack(pady=4)
+
+        self.log = ScrolledText(self, height=14, width=76, state="disabled")
+        self.log.pack(padx=10, pady=8, expand=True, fill="both")
+
+        self.button = tk.Button(self, text="Cancel", font=("Georgia", 14, "bold"),
+                                bg=PEACH, fg="white", command=self.cancel)
+        self.button.pack(pady=(0, 10))
+
+        self.protocol("WM_DELETE_WINDOW", self.cancel)
+        self.job.start()
+        self._poll()
+
+    def cancel(self):
+        if self.job.is_running():
+            self.stage_var.set("Cancelling…")
+            self.button.configure(state="disabled")
+            self.job.cancel()
+        else:
+            self.destroy()
+
+    def _append(self, line):
+        self.log.configure(state="normal")
+        self.log.insert(tk.END, line + "\n")
+        self.log.see(tk.END)
+        self.log.configure(state="disabled")
+
+    def _done_message(self):
+        """what the export made, from the stages that actually ran"""
+        outcome = {
+            "built": "The viewer application has been created!",
+            "reused": "The viewer application is unchanged, the previous build was reused.",
+        }.get(self.job.executable, "Open the viewer with the run script in the export folder.")
+        return f"Calendar exported successfully\n{outcome}"
+
+    def _poll(self):
+        finished = False
+        while not self.job.events.empty():
+            event = self.job.events.get_nowait()
+            kind = event[0]
+            if kind == "stage":
+                _, index, name = event
+                self.progress["value"] = index
+                self.stage_var.set(f"{name}…")
+                self._append(f"== {name}")
+            elif kind == "log":
+                self._append(event[1])
+            elif kind == "warning":
+                self._append(event[2])
+                messagebox.showwarning(event[1], event[2], parent=self)
+            elif kind == "done":
+                finished = True
+                self.progress["value"] = len(self.job.stages)
+                self.stage_var.set("Export complete")
+                messagebox.showinfo("Export complete", self._done_message(), parent=self)
+            elif kind == "error":
+                finished = True
+                self.stage_var.set("Export failed")
+                messagebox.showerror("Export error", event[1], parent=self)
+            elif kind == "cancelled":
+                finished = True
+                self.stage_var.set("Export cancelled")
+
+        if finished:
+            self.button.configure(text="Close", state="normal")
+        else:
+            self.after(100, self._poll)
@@ -0,0 +1,403 @@
+"""
+Calendar export as a pipeline of stages run on a worker thread.
+
+ExportJob has no UI of its own: progress, PyInstaller output and the final
+result are posted to job.events, which the export dialog polls from after().
+"""
+import hashlib
+import os
+import queue
+import shutil
+import platform
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+from datetime import datetime
+
+from database import SqliteRepo
+from export_cache import HashCache, ExportManifest, build_key, sha256_file
+from bundle import BUNDLE_NAME, write_bundle
+import shape_variants
+import tracing
+
+# Output names
+EXE_NAME = "RUN.exe"
+DB_NAME = "advent.db"  # what the viewer opens, whatever the editor's file is called
+APP_NAME = "RUN.app"
+
+PYINSTALLER_MISSING = (
+    "PyInstaller is not installed.\n\n"
+    "Export includes viewer.py and run scripts, but no standalone app.\n\n"
+    "Install PyInstaller to enable automatic .exe/.app creation:\n"
+    "    pip install pyinstaller"
+)
+
+
+class ExportCancelled(Exception):
+    pass
+
+
+def exe_artifact():
+    """what PyInstaller builds for the viewer here, None where it is not shipped"""
+    return {"Windows": EXE_NAME, "Darwin": APP_NAME}.get(platform.system())
+
+
+def export_folder_name():
+    return f"12 Clicks Export {datetime.now().strftime('%d_%m_%Y - %H_%M_%S')}"
+
+
+class ExportJob:
+    """
+    Exports a calendar into dest_folder. Exporting again into the same folder
+    only rewrites files whose content hash changed, and the PyInstaller build
+    is reused from cache_dir while the viewer sources stay the same.
+
+    Events put on self.events:
+        ("stage", index, name)   a stage started
+        ("log", line)            a line of output (PyInstaller is streamed)
+        ("warning", title, msg)  something was skipped
+        ("done", dest_folder)    finished
+        ("error", message)       failed
+        ("cancelled",)           stopped by cancel()
+    """
+
+    def __init__(self, dest_folder, src_dir, viewer_files, db_file,
+                 shapes_dir, cache_dir, writer=None, bundle=False,
+                 build_exe=True, build_cache_dir=None, calendar_id=None,
+                 scale_shapes=True, manifest_dir=None):
+        self.dest_folder = dest_folder
+        self.src_dir = src_dir
+        self.viewer_files = viewer_files
+        self.db_file = db_file
+        # calendar to export (None: the one last selected in the editor)
+        self.calendar_id = calendar_id
+        self.shapes_dir = shapes_dir
+        self.cache_dir = cache_dir
+        # PyInstaller builds; batch exports share one folder between calendars
+        self.build_cache_dir = build_cache_dir or os.path.join(cache_dir, "builds")
+        # what the last export into dest_folder wrote, outlives a scratch cache_dir
+        self.manifest_dir = manifest_dir or os.path.join(cache_dir, "manifests")
+        self.writer = writer
+        self.events = queue.Queue()
+        self._cancel = threading.Event()
+        self._proc = None
+        self._thread = None
+        self.bundle = bundle
+        self.hashes = None
+        self.manifest = None
+        # "built" or "reused" once the viewer executable is in the export
+        self.executable = None
+        self._staging_db = None
+        self._temp_paths = []  # per job scratch files in cache_dir, removed after run()
+        if bundle:
+            # database, assets and shapes go into one calendar.advent file
+            content_stages = [("Pack bundle", self.pack_bundle)]
+        else:
+            content_stages = [
+                ("Copy database", self.copy_db),
+                ("Copy assets", self.copy_assets),
+                ("Copy shapes", self.copy_shapes),
+            ]
+        # batch exports scale the shapes once up front instead
+        self.stages = [("Scale shapes", self.scale_shapes)] if scale_shapes else []
+        self.stages += content_stages + [
+            ("Write scripts", self.write_scripts),
+        ]
+        if build_exe:
+            self.stages.append(("Build executable", self.build_executable))
+
+    # ------------------------------ control ------------------------------
+    def start(self):
+        self._thread = threading.Thread(target=self.run, name="export", daemon=True)
+        self._thread.start()
+
+    def cancel(self):
+        """stop after the current step; kills PyInstaller if it is running"""
+        self._cancel.set()
+        proc = self._proc
+        if proc is not None and proc.poll() is None:
+            proc.kill()
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _post(self, *event):
+        self.events.put(event)
+
+    def _check_cancel(self):
+        if self._cancel.is_set():
+            raise ExportCancelled()
+
+    def run(self):
+        """runs every stage in order (called on the worker thread)"""
+        created = not os.path.exists(self.dest_folder)
+        try:
+            os.makedirs(self.dest_folder, exist_ok=True)
+            self.hashes = HashCache(self.cache_dir)
+            self.manifest = ExportManifest(self.dest_folder, self.manifest_dir)
+            for index, (name, stage) in enumerate(self.stages):
+                self._check_cancel()
+                self._post("stage", index, name)
+                with tracing.span(f"export: {name}"):
+                    stage()
+            self._check_cancel()
+            self.manifest.remove_stale()
+            self.manifest.save()
+        except ExportCancelled:
+            # only remove folders this export created, never an earlier export
+            if created:
+                shutil.rmtree(self.dest_folder, ignore_errors=True)
+            self._post("cancelled")
+            return
+        except Exception as e:
+            self._post("error", f"Failed to export files:\n{e}")
+            return
+        finally:
+            if self.hashes is not None:
+                self.hashes.save()
+            self._remove_temp_paths()
+        summary = f"{self.manifest.written} files written"
+        if self.manifest.methods:
+            summary += " (" + ", ".join(f"{n} {method}" for method, n
+                                        in sorted(self.manifest.methods.items())) + ")"
+        self._post("log", f"{summary}, {self.manifest.skipped} unchanged")
+        self._post("done", self.dest_folder)
+
+    def _temp_path(self, suffix):
+        """
+        fresh scratch file in cache_dir: a second export, or a batch run
+        sharing the cache, never writes over this job's files
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        fd, path = tempfile.mkstemp(prefix="export_staging.", suffix=suffix, dir=self.cache_dir)
+        os.close(fd)
+        self._temp_paths.append(path)
+        return path
+
+    def _remove_temp_paths(self):
+        for path in self._temp_paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self._temp_paths = []
+
+    def _place_staged(self, src, rel):
+        """place a scratch file; hashed directly, it has no use in the hash cache"""
+        self.manifest.place(src, rel, sha256_file(src))
+
+    def _place(self, src, rel):
+        digest = self.hashes.digest(src)
+        # a file named after its own hash is from the asset store, which never
+        # changes a file once written, so the export may share it (hard link)
+        stored = os.path.splitext(os.path.basename(src))[0] == digest
+        self.manifest.place(src, rel, digest, link=stored)
+
+    def _place_tree(self, src_dir, rel_root):
+        for root, dirs, files in os.walk(src_dir):
+            dirs.sort()
+            for name in sorted(files):
+                self._check_cancel()
+                src = os.path.join(root, name)
+                rel = os.path.join(rel_root, os.path.relpath(src, src_dir))
+                self._place(src, rel)
+
+    def _write_text(self, rel, text):
+        """write a generated file unless the export already has the same text"""
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        path = os.path.join(self.dest_folder, rel)
+        if self.manifest.old.get(rel) != digest or not os.path.exists(path):
+            with open(path, "w") as f:
+                f.write(text)
+            self.manifest.written += 1
+        else:
+            self.manifest.skipped += 1
+        self.manifest.record(rel, digest)
+        return path
+
+    # ------------------------------ stages ------------------------------
+    def _snapshot_db(self):
+        """
+        the exported calendar as a single calendar database in the cache
+        folder, in the layout the viewer reads
+        """
+        # make sure autosaved doors are in the database before copying it
+        if self.writer is not None:
+            self.writer.flush()
+        staging = self._temp_path(".db")
+        with SqliteRepo(self.db_file, shared=False) as repo:
+            repo.export_calendar_db(staging, self.calendar_id)
+        self._staging_db = staging
+        return staging
+
+    def _calendar_images(self):
+        """
+        (member name, source path) of each door image the exported calendar
+        uses; assets/ holds the images of every calendar in the editor
+        """
+        conn = sqlite3.connect(self._staging_db)
+        try:
+            paths = [row[0] for row in conn.execute(
+                "SELECT DISTINCT image_path FROM door WHERE image_path IS NOT NULL ORDER BY door_num")]
+        finally:
+            conn.close()
+        db_dir = os.path.dirname(os.path.abspath(self.db_file))
+        images = {}
+        for path in paths:
+            src = os.path.join(db_dir, path)  # relative paths (batch exports) start at the database
+            if os.path.isfile(src):
+                # the viewer looks door images up by file name in assets/
+                images.setdefault(os.path.join("assets", os.path.basename(src)), src)
+        return sorted(images.items())
+
+    def scale_shapes(self):
+        """refresh shapes/scaled so the viewer never resizes at startup"""
+        if os.path.isdir(self.shapes_dir):
+            written = shape_variants.build(self.shapes_dir)
+            if written:
+                self._post("log", f"Scaled {written} shape images")
+
+    def copy_db(self):
+        self._place_staged(self._snapshot_db(), DB_NAME)
+
+    def pack_bundle(self):
+        files = [(DB_NAME, self._snapshot_db())]
+        files.extend(self._calendar_images())
+        for root, dirs, names in os.walk(self.shapes_dir):
+            dirs.sort()
+            for name in sorted(names):
+                src = os.path.join(root, name)
+                files.append((os.path.join("shapes", os.path.relpath(src, self.shapes_dir)), src))
+        self._check_cancel()
+        staging = self._temp_path(".advent")
+        write_bundle(staging, files)
+        self._post("log", f"Packed {len(files)} files into {BUNDLE_NAME}")
+        self._place_staged(staging, BUNDLE_NAME)
+
+    def copy_assets(self):
+        for rel, src in self._calendar_images():
+            self._check_cancel()
+            self._place(src, rel)
+
+    def copy_shapes(self):
+        if os.path.isdir(self.shapes_dir):
+            self._place_tree(self.shapes_dir, "shapes")
+
+    def write_scripts(self):
+        # viewer + the shared modules it imports
+        for name in self.viewer_files:
+            self._place(os.path.join(self.src_dir, name), name)
+
+        # --- Create helper scripts (optional) ---
+        self._write_text(
+            "windows.bat",
+            "@echo off\n"
+            "echo Launching Advent Calendar Viewer...\n"
+            "python viewer.py\n"
+            "pause\n"
+        )
+
+        sh_path = self._write_text(
+            "mac.sh",
+            "#!/bin/bash\n"
+            "echo \"Launching Advent Calendar Viewer...\"\n"
+            "python3 viewer.py\n"
+        )
+        try:
+            os.chmod(sh_path, 0o755)
+        except OSError:
+            pass
+
+    def build_executable(self):
+        system = platform.system()
+        artifact = exe_artifact()
+        if artifact is None:
+            self._post("warning", "Executable Not Built",
+                       f"No standalone app is made on {system}; use the run scripts.")
+            return
+
+        pyinstaller_cmd = shutil.which("pyinstaller")
+        if not pyinstaller_cmd:
+            self._post("warning", "Executable Not Built", PYINSTALLER_MISSING)
+            return
+
+        # same viewer sources + same toolchain -> same executable
+        key = build_key(
+            self.hashes,
+            [os.path.join(self.src_dir, name) for name in self.viewer_files],
+            system, sys.version, pyinstaller_cmd, os.path.getmtime(pyinstaller_cmd)
+        )
+        build_dir = os.path.join(self.build_cache_dir, key)
+        built = os.path.join(build_dir, artifact)
+
+        if os.path.exists(built):
+            self._post("log", "Viewer unchanged, reusing the cached executable.")
+            self.manifest.place(built, artifact, key, link=True)
+            self.executable = "reused"
+            return
+
+        self._post("log", "Creating .exe/.app using PyInstaller… This may take 30–60 seconds.")
+        # each job builds into a folder of its own (batch workers may build at
+        # the same time) which is renamed into the cache; the first one wins
+        os.makedirs(self.build_cache_dir, exist_ok=True)
+        partial = tempfile.mkdtemp(prefix=f"{key}.", suffix=".partial", dir=self.build_cache_dir)
+        try:
+            self._run_pyinstaller(pyinstaller_cmd, partial)
+            self._check_cancel()
+            source = os.path.join(partial, artifact)
+            if not os.path.exists(source):
+                self._post("warning", "Executable Not Built",
+                           f"PyInstaller finished without making {artifact}; use the run scripts.")
+                return
+            try:
+                os.rename(partial, build_dir)
+                source = built
+            except OSError:
+                pass  # cache slot already taken, this export uses its own build
+            # cached builds are never modified, only replaced as a whole
+            self.manifest.place(source, artifact, key, link=True)
+            self.executable = "built"
+        finally:
+            shutil.rmtree(partial, ignore_errors=True)
+
+    def _run_pyinstaller(self, pyinstaller_cmd, dist_dir):
+        """
+        runs PyInstaller and streams its output line by line. Work and spec
+        files go to a scratch folder of this job, so concurrent builds can't
+        mix them up (finished builds are cached by build_executable)
+        """
+        work_dir = tempfile.mkdtemp(prefix="pyinstaller_work.", dir=self.cache_dir)
+        try:
+            self._popen_pyinstaller(pyinstaller_cmd, dist_dir, work_dir)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    def _popen_pyinstaller(self, pyinstaller_cmd, dist_dir, work_dir):
+        self._proc = subprocess.Popen(
+            [
+                pyinstaller_cmd,
+                "--onefile",
+                "--windowed",
+                "--noconfirm",
+                "--name", EXE_NAME.replace(".exe", ""),  # Base name for both .exe and .app
+                "--distpath", dist_dir,
+                "--workpath", os.path.join(work_dir, "build"),
+                "--specpath", work_dir,
+                os.path.join(self.dest_folder, "viewer.py")
+            ],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            bufsize=1,
+        )
+        if self._cancel.is_set():
+            self._proc.kill()
+        try:
+            for line in self._proc.stdout:
+                self._post("log", line.rstrip())
+        finally:
+            self._proc.stdout.close()
+            self._proc.wait()
+            self._proc = None
@@ -0,0 +1,210 @@
+"""
+Shared cache of decoded + resized images for the editor and the viewer.
+
+Pages ask for the same background art over and over (tree, star, pears, dove,
+title text). Each entry keeps the resized PIL image and its PhotoImage so that
+switching pages doesn't touch the disk or run LANCZOS again.
+"""
+import os
+from collections import OrderedDict
+
+from PIL import Image, ImageTk
+
+import tracing
+
+# default memory budget for cached images (PIL pixels + PhotoImage pixels)
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+LANCZOS = Image.Resampling.LANCZOS
+
+
+class FileSource:
+    """images read straight from the file system"""
+
+    def exists(self, path):
+        return os.path.exists(path)
+
+    def mtime(self, path):
+        return os.path.getmtime(path)
+
+    def open(self, path):
+        return path
+
+
+class _Entry:
+    __slots__ = ("image", "photo", "nbytes")
+
+    def __init__(self, image):
+        self.image = image
+        self.photo = None
+        self.nbytes = _image_bytes(image)
+
+
+def _image_bytes(image):
+    return image.width * image.height * len(image.getbands())
+
+
+class ImageCache:
+    """
+    LRU cache keyed by (path, target size, resample filter, file mtime).
+    Evicts least recently used entries once max_bytes is exceeded.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, source=None):
+        self.max_bytes = max_bytes
+        # where images come from: the file system or e.g. a calendar bundle
+        self.source = source or FileSource()
+        self.size_bytes = 0
+        self._entries = OrderedDict()
+        self._mtimes = {}  # path -> mtime, stat'd once until invalidated
+
+    # ------------------------------ keys ------------------------------
+    def _mtime(self, path):
+        mtime = self._mtimes.get(path)
+        if mtime is None:
+            mtime = self.source.mtime(path)
+            self._mtimes[path] = mtime
+        return mtime
+
+    def _key(self, path, width, box, resample):
+        size = ("box", tuple(box)) if box else ("width", width)
+        return (path, size, resample, self._mtime(path))
+
+    # ------------------------------ lookups ------------------------------
+    def get_image(self, path, width=None, box=None, resample=LANCZOS):
+        """
+        resized PIL image for path. width keeps the aspect ratio,
+        box fits the image inside (w, h) like Image.thumbnail
+        """
+        return self._lookup(path, width, box, resample).image
+
+    def get_photo(self, path, width=None, box=None, resample=LANCZOS):
+        """
+        PhotoImage for path at the requested size (needs a Tk root).
+        Callers must keep a reference while the image is on screen.
+        """
+        entry = self._lookup(path, width, box, resample)
+        if entry.photo is None:
+            entry.photo = ImageTk.PhotoImage(entry.image)
+            photo_bytes = entry.image.width * entry.image.height * 4
+            entry.nbytes += photo_bytes
+            self._add_bytes(photo_bytes)
+        return entry.photo
+
+    def contains(self, path, width=None, box=None, resample=LANCZOS):
+        """true if the image is cached (no decoding, no disk access after the first stat)"""
+        return self._key(path, width, box, resample) in self._entries
+
+    def nearest_photo(self, path, box, resample=LANCZOS):
+        """
+        PhotoImage of the cached box size of path closest to box, or None.
+        Shown while the exact size is still being decoded, e.g. after a resize
+        """
+        mtime = self._mtime(path)
+        sizes = [key[1][1] for key in self._entries
+                 if key[0] == path and key[1][0] == "box" and key[2] == resample and key[3] == mtime]
+        if not sizes:
+            return None
+        nearest = min(sizes, key=lambda s: abs(s[0] - box[0]) + abs(s[1] - box[1]))
+        return self.get_photo(path, box=nearest, resample=resample)
+
+    def put_image(self, path, image, width=None, box=None, resample=LANCZOS):
+        """
+        store an image decoded elsewhere (e.g. by a background thread with
+        decode()) under the same key get_image would use
+        """
+        key = self._key(path, width, box, resample)
+        if key not in self._entries:
+            entry = self._entries[key] = _Entry(image)
+            self._add_bytes(entry.nbytes)
+
+    def decode(self, path, width=None, box=None, resample=LANCZOS):
+        """
+        decode + resize without touching the cache; safe to call from a
+        worker thread, hand the result back with put_image
+        """
+        return _load(self.source.open(path), width, box, resample)
+
+    def _lookup(self, path, width, box, resample):
+        key = self._key(path, width, box, resample)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            tracing.count("image_cache.hits")
+            return entry
+
+        tracing.count("image_cache.misses")
+        entry = _Entry(_load(self.source.open(path), width, box, resample))
+        self._entries[key] = entry
+        self._add_bytes(entry.nbytes)
+        return entry
+
+    # ------------------------------ eviction ------------------------------
+    def _add_bytes(self, nbytes):
+        self.size_bytes += nbytes
+        # never evict the entry that was just used (the last one)
+        while self.size_bytes > self.max_bytes and len(self._entries) > 1:
+            _, old = self._entries.popitem(last=False)
+            self.size_bytes -= old.nbytes
+
+    def invalidate(self, path=None):
+        """
+        forget cached images for path (or everything) so the next lookup
+        re-reads the file, e.g. after a door image was replaced
+        """
+        if path is None:
+            self._entries.clear()
+            self._mtimes.clear()
+            self.size_bytes = 0
+            return
+        self._mtimes.pop(path, None)
+        for key in [k for k in self._entries if k[0] == path]:
+            self.size_bytes -= self._entries.pop(key).nbytes
+
+    def __len__(self):
+        return len(self._entries)
+
+
+@tracing.traced("image load+resize")
+def _load(fp, width, box, resample):
+    with Image.open(fp) as img:
+        img.load()
+        if box:
+            img = img.copy()
+            img.thumbnail(box, resample)
+            return img
+        if width:
+            height = max(1, int(img.height * width / img.width))
+            return img.resize((width, height), resample)
+        return img.copy()
+
+
+_shared = ImageCache()
+
+
+def shared_cache():
+    """process-wide cache used by both apps"""
+    return _shared
+
+
+def configure(max_bytes):
+    """change the byte budget of the shared cache"""
+    _shared.max_bytes = max_bytes
+    _shared._add_bytes(0)
+
+
+def use_source(source):
+    """read images for the shared cache from source (exists/mtime/open)"""
+    _shared.invalidate()
+    _shared.source = source
+
+
+def image_exists(path):
+    return _shared.source.exists(path)
+
+
+def get_photo(path, width=None, box=None, resample=LANCZOS):
+    return _shared.get_photo(path, width=width, box=box, resample=resample)
+
+
+def get_image(path, width=None, box=None, resample=LANCZOS):
+    return _shared.get_image(path, width=width, box=box, resample=resample)
@@ -0,0 +1,81 @@
+"""
+Image ingest for door uploads.
+
+Phone photos can be 24 MP; the viewer never shows a door image larger than
+VIEWER_BOX. Uploads are decoded at reduced size where the format allows it,
+rotated per their EXIF orientation, shrunk, stripped of metadata and
+re-encoded, so the stored asset stays small whatever camera took it.
+
+The result is stored under the sha256 of its bytes (content addressed): the
+same picture used on several doors or calendars is one file, and a file in
+the store never changes once written.
+"""
+import hashlib
+import io
+import os
+import shutil
+
+from PIL import Image, ImageOps
+
+from tracing import traced
+
+# viewer shows door images inside 400x300; keep 2x for high-DPI screens
+VIEWER_BOX = (800, 600)
+JPEG_QUALITY = 85
+
+
+def _has_alpha(img):
+    return img.mode in ("RGBA", "LA", "PA") or (img.mode == "P" and "transparency" in img.info)
+
+
+def normalize_image(src_path, box=VIEWER_BOX):
+    """
+    decoded, upright image that fits inside box
+    """
+    with Image.open(src_path) as img:
+        if img.format == "JPEG":
+            # let libjpeg decode at 1/2, 1/4 or 1/8 scale; square box since
+            # the EXIF rotation below may swap width and height
+            side = max(box)
+            img.draft("RGB", (side, side))
+        img = ImageOps.exif_transpose(img)
+        img.thumbnail(box, Image.Resampling.LANCZOS, reducing_gap=3.0)
+        return img
+
+
+def encode_image(src_path, box=VIEWER_BOX):
+    """
+    (bytes, extension) of the normalized image: JPEG, or PNG for images
+    with transparency. Metadata is dropped since nothing is passed on save
+    """
+    img = normalize_image(src_path, box)
+    buf = io.BytesIO()
+    if _has_alpha(img):
+        img.convert("RGBA").save(buf, "PNG", optimize=True)
+        return buf.getvalue(), ".png"
+    img.convert("RGB").save(buf, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+    return buf.getvalue(), ".jpg"
+
+
+@traced()
+def ingest_image(src_path, dest_dir, keep_original_dir=None, box=VIEWER_BOX):
+    """
+    stores the normalized image as dest_dir/<sha256>.jpg (or .png) and
+    returns its path; nothing is written if that content is already there.
+    keep_original_dir: also keep the untouched upload there
+    """
+    data, ext = encode_image(src_path, box)
+    digest = hashlib.sha256(data).hexdigest()
+    dest = os.path.join(dest_dir, digest + ext)
+    if not os.path.exists(dest):
+        os.makedirs(dest_dir, exist_ok=True)
+        with open(dest + ".partial", "wb") as f:
+            f.write(data)
+        os.replace(dest + ".partial", dest)
+
+    if keep_original_dir:
+        original = os.path.join(keep_original_dir, digest + os.path.splitext(src_path)[1])
+        if not os.path.exists(original):
+            os.makedirs(keep_original_dir, exist_ok=True)
+            shutil.copy(src_path, original)
+    return dest
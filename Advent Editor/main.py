@@ -1,23 +1,53 @@
+import startup_profile  # first, so the import phase is measured
 import os
-import shutil
-import platform
-import subprocess
-from datetime import datetime
-from PIL import Image, ImageTk
+import re
+import textwrap
 
 import tkinter as tk
-from tkinter import ttk, messagebox, filedialog
+from tkinter import ttk, messagebox
+
+from PIL import ImageTk
 
 from config import (
     DB_FILE,
     SHAPES_DIR,
     ASSETS_DIR,
+    EXPORT_CACHE_DIR,
+    EXPORT_MANIFEST_DIR,
+    THUMB_CACHE_DIR,
+    SPRITE_CACHE_DIR,
     PEACH,
-    WINDOW_WIDTH
+    WINDOW_WIDTH,
+    IMAGE_CACHE_BYTES,
+    VIEWER_FILES,
+    DOOR_COUNTS,
+    SEARCH_DELAY_MS,
+    SEARCH_RESULTS,
+    VISIBLE_DOOR_ROWS,
+    MAX_DOOR_COLUMNS
 )
+import image_cache
+import sprites
+import shape_variants
 from database import SqliteRepo
-from ui_helpers import round_rect, pill
-from door_editor import DoorEditor
+from autosave import WriteBehindQueue
+from asset_store import collect_garbage, unused_files
+from pages import PageManager, ShapeImages, make_container
+from ui_helpers import round_rect, pill, Debouncer
+from door_editor import DoorEditor, store_door_image
+from door_grid import DoorGrid, THUMB_BOX
+from prefetch import DecodePool
+from thumbnails import ThumbnailCache
+from tracing import traced
+
+startup_profile.mark("imports")
+startup_profile.mark_first_call(image_cache, "_load", "first image decode")
+
+# door import / export file formats
+DOOR_FILE_TYPES = [("JSON Lines", "*.jsonl"), ("CSV", "*.csv")]
+
+# wrapped around the matched words in search snippets, shown in bold
+SEARCH_MARKS = ("\x02", "\x03")
 
 
 class EditorApp(tk.Tk):
@@ -25,14 +55,36 @@ class EditorApp(tk.Tk):
 
     def __init__(self):
         super().__init__()
+        startup_profile.mark("Tk init")
         self.title("12 CLICKS - Editor")
         self.geometry("900x700")
         self.configure(bg="white")
 
         self.repo = SqliteRepo()
+        self.writer = WriteBehindQueue(DB_FILE)
+        startup_profile.mark("DB open")
+        image_cache.configure(IMAGE_CACHE_BYTES)
+        sprites.use_disk_cache(SPRITE_CACHE_DIR)
+        # pre-scaled background images as last built; the ones whose shape
+        # changed are redone in the background and swapped in when ready
+        self.shapes = shape_variants.ShapeVariants(SHAPES_DIR, shape_variants.display_scale(self))
+        # door previews for the grid, made on worker threads
+        self.decoder = DecodePool(self)
+        self.decoder.submit(("shape_variants",), shape_variants.build, SHAPES_DIR,
+                            callback=self._on_shapes_built)
+        self.thumb_cache = ThumbnailCache(THUMB_CACHE_DIR, THUMB_BOX)
+        self._thumbs = {}  # image path -> (mtime, box, PhotoImage)
         self._load_fonts()
         self._build_menu()
+        self._build_status_bar()
+        self._register_pages()
         self.show_welcome()
+        self._poll_writer()
+
+    def _on_shapes_built(self, written, error):
+        if error is None and written:
+            self.shapes = shape_variants.ShapeVariants(SHAPES_DIR, self.shapes.scale)
+            self.shape_images.set_shapes(self.shapes)
 
     def _load_fonts(self):
         self.title_font = ("Slight", 32, "bold")
@@ -42,33 +94,110 @@ class EditorApp(tk.Tk):
         menubar = tk.Menu(self)
         filemenu = tk.Menu(menubar, tearoff=0)
         filemenu.add_command(label="Export Calendar", command=self.export_calendar)
+        filemenu.add_command(label="Export as Single File",
+                             command=lambda: self.export_calendar(bundle=True))
         filemenu.add_separator()
-        filemenu.add_command(label="Quit", command=self.destroy)
+        filemenu.add_command(label="Import Doors…", command=self.import_doors)
+        filemenu.add_command(label="Export Doors…", command=self.export_doors)
+        filemenu.add_separator()
+        filemenu.add_command(label="Clean Up Unused Images…", command=self.clean_up_images)
+        filemenu.add_separator()
+        filemenu.add_command(label="Quit", command=self.on_close)
 
         menubar.add_cascade(label="Menu", menu=filemenu)
         self.config(menu=menubar)
 
-    def clear_frame(self):
+    def _build_status_bar(self):
+        """
+        one line at the bottom for non-blocking messages (saves, exports)
+        """
+        self.status_var = tk.StringVar()
+        tk.Label(self, textvariable=self.status_var, bg="white", fg=PEACH,
+                 font=("Georgia", 12), anchor="w").pack(side="bottom", fill="x", padx=10)
+
+    def set_status(self, text):
+        self.status_var.set(text)
+
+    def _poll_writer(self):
+        """
+        hand finished background writes back to the UI
         """
-        Used for any window to clear page for new content
+        self.writer.poll()
+        self._poll_id = self.after(100, self._poll_writer)
+
+    def clean_up_images(self):
         """
-        for widget in self.winfo_children():
-            if not isinstance(widget, tk.Menu):
-                widget.destroy()
+        delete stored images no door uses any more, after asking. Counting
+        and deleting both run as writer jobs, after the door saves queued
+        before them, so the Tk thread never waits on the disk
+        """
+        if "door_editor" in self.pages.pages:
+            self.door_editor.flush_pending()
+        self.set_status("Looking for unused images...")
+        self.writer.submit(
+            ("unused_files",),
+            lambda repo: len(unused_files(repo, ASSETS_DIR)),
+            # the dialog runs its own event loop, keep it out of poll()
+            on_done=lambda count, error: self.after(0, self._confirm_clean_up, count, error)
+        )
+
+    def _confirm_clean_up(self, count, error):
+        if error is not None:
+            self.set_status(f"Clean up failed: {error}")
+            return
+        self.set_status("")
+        if not count:
+            messagebox.showinfo("Clean Up", "There are no unused images.")
+            return
+        if not messagebox.askyesno(
+                "Clean Up", f"Delete {count} images that no door uses any more?"):
+            return
+        # unused_files is checked again there, a door may have taken one meanwhile
+        self.writer.submit(
+            ("collect_garbage",),
+            lambda repo: collect_garbage(repo, ASSETS_DIR),
+            on_done=self._on_garbage_collected
+        )
 
+    def _on_garbage_collected(self, result, error):
+        if error is not None:
+            self.set_status(f"Clean up failed: {error}")
+            return
+        removed, freed = result
+        self.set_status(f"Removed {removed} unused images ({freed // 1024} KB).")
+
+    def on_door_saved(self, calendar_id, door_num):
+        self.set_status(f"Door {door_num} saved.")
+        if "doors" in self.pages.pages and calendar_id == self.repo.calendar_id:
+            self.door_grid.refresh()
+
+    def _register_pages(self):
+        """
+        Pages are built once on first visit, then only refreshed and raised
+        """
+        self.pages = PageManager(make_container(self, "white"))
+        self.shape_images = ShapeImages(self.pages, self.shapes, self.decoder)
+        self.pages.on_rescale(self._rescale)
+        self.pages.register("welcome", self._build_welcome)
+        self.pages.register("name", self._build_name_page, self._refresh_name_page)
+        self.pages.register("doors", self._build_doors_page, self._refresh_doors_page)
+        self.pages.register("door_editor", self._build_door_editor, self._refresh_door_editor)
+
+    @traced()
     def show_background_images(self, root):
         """
         reused for all pages, shows the two background images of the tree and star
         """
-        tree = Image.open(os.path.join(SHAPES_DIR, "tree.png"))
-        tree = tree.resize((300, int(tree.height * 300 / tree.width)), Image.Resampling.LANCZOS)
-        self.tree_img = ImageTk.PhotoImage(tree)
-        tk.Label(root, image=self.tree_img, bg="white").place(x=10, rely=1.0, anchor="sw")
+        self.shape_images.label(root, "tree.png", 300, bg="white").place(x=10, rely=1.0, anchor="sw")
+        self.shape_images.label(root, "star.png", 400, bg="white").place(relx=1.0, y=60, anchor="ne")
 
-        star = Image.open(os.path.join(SHAPES_DIR, "star.png"))
-        star = star.resize((400, int(star.height * 400 / star.width)), Image.Resampling.LANCZOS)
-        self.star_img = ImageTk.PhotoImage(star)
-        tk.Label(root, image=self.star_img, bg="white").place(relx=1.0, y=60, anchor="ne")
+    def _rescale(self, scale):
+        """
+        window settled at another size: a resized door grid (the shapes
+        swap themselves, see ShapeImages)
+        """
+        if "doors" in self.pages.pages:
+            self.door_grid.set_scale(scale)
 
     # ------------ Pages --------------------
 
@@ -76,9 +205,10 @@ class EditorApp(tk.Tk):
         """
         Introductory page that displays project title
         """
-        self.clear_frame()
-        frame = tk.Frame(self, bg="white")
-        frame.pack(expand=True, fill="both")
+        self.pages.show("welcome")
+
+    def _build_welcome(self, parent):
+        frame = tk.Frame(parent, bg="white")
         self.show_background_images(frame)
 
         card = tk.Canvas(frame, width=WINDOW_WIDTH, height=360, bg="white", highlightthickness=0)
@@ -92,10 +222,7 @@ class EditorApp(tk.Tk):
             fill="white"
         )
 
-        img = Image.open(os.path.join(SHAPES_DIR, "welcome_text.png"))
-        img = img.resize((600, int(img.height * 600 / img.width)), Image.Resampling.LANCZOS)
-        self.welcome_img = ImageTk.PhotoImage(img)
-        card.create_image(WINDOW_WIDTH/2, 180, image=self.welcome_img)
+        self.shape_images.canvas_image(card, WINDOW_WIDTH/2, 180, "welcome_text.png", 600)
 
         card.create_text(
             WINDOW_WIDTH/2, 280,
@@ -115,14 +242,16 @@ class EditorApp(tk.Tk):
             font=("Georgia", 16, "bold")
         )
         btn_holder.bind("<Button-1>", lambda e: self.show_name_page())
+        return frame
 
     def show_name_page(self):
         """
         Page that prompts user to enter name for their calendar
         """
-        self.clear_frame()
-        frame = tk.Frame(self, bg="white")
-        frame.pack(expand=True, fill="both")
+        self.pages.show("name")
+
+    def _build_name_page(self, parent):
+        frame = tk.Frame(parent, bg="white")
         self.show_background_images(frame)
 
         card_width = 700
@@ -146,11 +275,24 @@ class EditorApp(tk.Tk):
         style = ttk.Style()
         style.configure("Large.TEntry", padding=10, font=("Georgia", 16))
 
-        entry = ttk.Entry(card, textvariable=self.name_var, width=40, font=("Georgia", 16))
+        self.name_entry = ttk.Entry(card, textvariable=self.name_var, width=40, font=("Georgia", 16))
 
 
-        card.create_window(card_width // 2, 150, window=entry)
-        entry.focus()
+        card.create_window(card_width // 2, 150, window=self.name_entry)
+
+        # Calendar length
+        card.create_text(
+            card_width // 2 - 50, 210,
+            text="DOORS:",
+            font=("Georgia", 16, "bold"),
+            fill="white"
+        )
+        self.door_count_var = tk.StringVar()
+        count_box = ttk.Combobox(
+            card, textvariable=self.door_count_var, state="readonly", width=5,
+            values=[str(n) for n in DOOR_COUNTS], font=("Georgia", 14)
+        )
+        card.create_window(card_width // 2 + 50, 210, window=count_box)
 
         # Button
         btn_holder = tk.Canvas(frame, width=230, height=70, bg="white", highlightthickness=0)
@@ -163,6 +305,12 @@ class EditorApp(tk.Tk):
             font=("Georgia", 16, "bold")
         )
         btn_holder.bind("<Button-1>", lambda e: self.save_name_and_show_doors())
+        return frame
+
+    def _refresh_name_page(self, state):
+        self.name_var.set(self.repo.get_viewer_name() or "")
+        self.door_count_var.set(str(self.repo.get_door_count()))
+        self.name_entry.focus()
 
     def save_name_and_show_doors(self):
         """
@@ -173,32 +321,33 @@ class EditorApp(tk.Tk):
             messagebox.showwarning("Required", "Please enter a name.")
             return
         self.repo.set_viewer_name(name)
+        door_count = int(self.door_count_var.get())
+        if door_count != self.repo.get_door_count():
+            self.repo.set_door_count(door_count)
         self.show_doors_page()
 
     def show_doors_page(self):
         """
         The actual code that shows the doors grid
         """
-        self.clear_frame()
+        self.pages.show("doors")
 
-        frame = tk.Frame(self, bg="white")
-        frame.pack(expand=True, fill="both")
+    def _build_doors_page(self, parent):
+        frame = tk.Frame(parent, bg="white")
         self.show_background_images(frame)
 
         top_bar = tk.Frame(frame, bg="white")
         top_bar.pack(fill="x")
-        img = Image.open(os.path.join(SHAPES_DIR, "edit_calendar.png"))
-        img = img.resize((600, int(img.height * 600 / img.width)), Image.Resampling.LANCZOS)
-        self.title_img = ImageTk.PhotoImage(img)
-
         export_btn = ttk.Menubutton(top_bar, text="Export")
         menu = tk.Menu(export_btn, tearoff=0)
         menu.add_command(label="Export Calendar", command=self.export_calendar)
+        menu.add_command(label="Export as Single File",
+                         command=lambda: self.export_calendar(bundle=True))
         export_btn["menu"] = menu
         export_btn.pack(side="left", padx=10)
 
         try:
-            tk.Label(top_bar, image=self.title_img, bg="white") \
+            self.shape_images.label(top_bar, "edit_calendar.png", 600, bg="white") \
                 .pack(side="left", padx=20)
         except AttributeError:
             # Fallback if the image object isn't defined
@@ -206,36 +355,187 @@ class EditorApp(tk.Tk):
                         font=("Georgia", 30), bg="white") \
                         .pack(side="left", padx=20)
 
-        grid_container = tk.Frame(frame, bg="white")
-        grid_container.pack(expand=True)
-
-        for i in range(12):
-            r, c = divmod(i, 4)
-            doornum = i + 1
+        tool_bar = tk.Frame(frame, bg="white")
+        tool_bar.pack(fill="x", padx=10, pady=(0, 5))
+
+        # calendar picker: switching keeps the same database connection
+        self.calendar_box = ttk.Combobox(tool_bar, state="readonly", width=18, font=("Georgia", 14))
+        self.calendar_box.bind("<<ComboboxSelected>>", self._on_calendar_picked)
+        self.calendar_box.pack(side="left")
+        ttk.Button(tool_bar, text="New Calendar", command=self.new_calendar) \
+            .pack(side="left", padx=10)
+        self._calendars = []
+
+        # search over the messages of every calendar, run once typing pauses
+        self.search_var = tk.StringVar()
+        ttk.Entry(tool_bar, textvariable=self.search_var, width=24, font=("Georgia", 14)) \
+            .pack(side="right")
+        tk.Label(tool_bar, text="Search:", font=("Georgia", 14), bg="white") \
+            .pack(side="right", padx=5)
+        self._search = Debouncer(self, SEARCH_DELAY_MS, self._run_search)
+        self.search_var.trace_add("write", lambda *args: self._search())
+
+        self.search_results = tk.Text(frame, height=1, wrap="none", font=("Georgia", 12),
+                                      bg="white", relief="flat", cursor="hand2")
+        self.search_results.tag_configure("match", font=("Georgia", 12, "bold"), foreground=PEACH)
+        self._tool_bar = tool_bar
+
+        self.door_grid = DoorGrid(
+            frame, self.repo.get_door_count(), self.open_door_editor,
+            bg="white", fill=PEACH, padx=15, pady=15,
+            visible_rows=VISIBLE_DOOR_ROWS, max_cols=MAX_DOOR_COLUMNS,
+            load_page=self._load_door_page
+        )
+        self.door_grid.set_scale(self.pages.scale)
+        self.door_grid.pack(expand=True)
+        return frame
+
+    def _refresh_doors_page(self, state):
+        self._update_calendar_picker()
+        door_count = self.repo.get_door_count()
+        if door_count != self.door_grid.door_count:
+            self.door_grid.set_door_count(door_count)
+        else:
+            self.door_grid.refresh()
+        if self.search_var.get().strip():
+            self._run_search()  # messages may have changed in the editor
+
+    def _update_calendar_picker(self):
+        self._calendars = self.repo.list_calendars()
+        self.calendar_box["values"] = [title for _, title, _ in self._calendars]
+        ids = [calendar_id for calendar_id, _, _ in self._calendars]
+        self.calendar_box.current(ids.index(self.repo.calendar_id))
+
+    def _on_calendar_picked(self, event):
+        self.switch_calendar(self._calendars[self.calendar_box.current()][0])
+
+    @traced()
+    def switch_calendar(self, calendar_id):
+        """
+        edit another calendar from the same file; only its first page of
+        doors is read, nothing is reopened
+        """
+        if calendar_id == self.repo.calendar_id:
+            return
+        if "door_editor" in self.pages.pages:
+            self.door_editor.flush_pending()
+        self.repo.select_calendar(calendar_id)
+        self._refresh_doors_page(None)
+        self.set_status(f"Editing {self.calendar_box.get()}.")
+
+    @traced()
+    def _run_search(self):
+        """
+        list the doors matching the search box under the tool bar; a click
+        on a result opens that door (in its calendar)
+        """
+        query = self.search_var.get().strip()
+        text = self.search_results
+        text.configure(state="normal")
+        text.delete("1.0", "end")
+        if not query:
+            text.pack_forget()
+            return
+        hits = self.repo.search(query, SEARCH_RESULTS, mark=SEARCH_MARKS)
+        if not hits:
+            text.insert("end", "No doors found.")
+        for i, hit in enumerate(hits):
+            tag = f"hit{i}"
+            text.insert("end", f"{hit.title} · Door {hit.door_num}:  ", tag)
+            # odd parts are the matched words
+            parts = re.split("[" + "".join(SEARCH_MARKS) + "]", hit.snippet.replace("\n", " "))
+            for j, part in enumerate(parts):
+                text.insert("end", part, (tag, "match") if j % 2 else tag)
+            text.insert("end", "\n")
+            text.tag_bind(tag, "<Button-1>", lambda e, hit=hit: self._open_search_hit(hit))
+        text.configure(state="disabled", height=min(max(len(hits), 1), 6))
+        text.pack(after=self._tool_bar, fill="x", padx=20, pady=(0, 5))
+
+    def _open_search_hit(self, hit):
+        self.switch_calendar(hit.calendar_id)
+        self.open_door_editor(hit.door_num)
+
+    def new_calendar(self):
+        """
+        add an empty calendar and ask who it is for
+        """
+        if "door_editor" in self.pages.pages:
+            self.door_editor.flush_pending()
+        self.repo.select_calendar(self.repo.create_calendar("New calendar"))
+        self.show_name_page()
 
-            door_canvas = tk.Canvas(
-                grid_container, width=180, height=180,
-                bg="white", highlightthickness=0
-            )
-            door_canvas.grid(row=r, column=c, padx=15, pady=15)
+    @traced()
+    def _load_door_page(self, doors):
+        """
+        metadata for one page of the door grid: a tick on doors with content,
+        a message snippet and a thumbnail (placeholder until it is made)
+        """
+        page = {}
+        for door in self.repo.get_doors(doors):
+            info = {
+                "badge": "✓" if (door.message or door.image_path) else "",
+                "snippet": textwrap.shorten(door.message or "", 40, placeholder="…"),
+            }
+            if door.image_path and os.path.exists(door.image_path):
+                info["thumb"] = self._door_thumbnail(door.door_num, door.image_path)
+                info["thumb_pending"] = info["thumb"] is None
+            page[door.door_num] = info
+        return page
+
+    def _door_thumbnail(self, door_num, image_path):
+        """
+        PhotoImage preview of image_path if one is ready, otherwise None and
+        a worker makes it (or reads it from the thumbnail cache on disk)
+        """
+        mtime = os.path.getmtime(image_path)
+        box = self.door_grid.thumb_box  # previews grow with the grid
+        known = self._thumbs.get(image_path)
+        if known and known[:2] == (mtime, box):
+            return known[2]
+        self.decoder.submit(
+            ("thumb", image_path, mtime, box), self.thumb_cache.load, image_path, box,
+            callback=lambda image, error: self._on_thumbnail(door_num, image_path, mtime, box, image, error)
+        )
+        return None
 
-            round_rect(door_canvas, 10, 10, 170, 170, r=40, fill=PEACH)
-            door_canvas.create_text(90, 90, text=str(doornum), fill="white",
-                                    font=("Georgia", 32, "bold"))
-            door_canvas.bind("<Button-1>", lambda e, n=doornum: self.open_door_editor(n))
+    def _on_thumbnail(self, door_num, image_path, mtime, box, image, error):
+        if error is not None:
+            self.door_grid.update_info(door_num, thumb_pending=False)
+            return
+        photo = ImageTk.PhotoImage(image)
+        self._thumbs[image_path] = (mtime, box, photo)
+        if box != self.door_grid.thumb_box:
+            return  # the grid was rescaled meanwhile, that size is on its way
+        if os.path.exists(image_path) and os.path.getmtime(image_path) == mtime:
+            # otherwise the image was replaced meanwhile and a newer thumb is on its way
+            self.door_grid.update_info(door_num, thumb=photo, thumb_pending=False)
 
     def open_door_editor(self, door_num: int):
         """
-        Create door editor object
+        Show door editor page for the door
         """
-        self.clear_frame()
-        DoorEditor(self, door_num)
+        self.pages.show("door_editor", door_num)
+
+    def _build_door_editor(self, parent):
+        self.door_editor = DoorEditor(parent, self)
+        return self.door_editor
+
+    def _refresh_door_editor(self, door_num):
+        self.door_editor.show_door(door_num)
 
     # ------------------------------ Export -------------------------
-    def export_calendar(self):
+    def export_calendar(self, bundle=False):
         """
-        Exports calendar into file containing .exe or .app file that user's friend can open
+        Exports calendar into file containing .exe or .app file that user's friend can open.
+        bundle=True packs the database, assets and shapes into one .advent file.
+        The stages run on a worker thread, progress is shown in an ExportDialog
         """
+        # the export machinery (PyInstaller, bundles, hashing) is only loaded when used
+        from tkinter import filedialog
+        from exporter import ExportJob, export_folder_name
+        from export_cache import ExportManifest
+        from export_dialog import ExportDialog
+
         # Ask user for export location
         save_dir = filedialog.askdirectory(title="Choose folder to place exported package")
         if not save_dir:
@@ -252,125 +552,90 @@ class EditorApp(tk.Tk):
             )
             return
 
-        # Output names
-        exe_name = "RUN.exe"
-        app_name = "RUN.app"
-
-        # Build export directory
-        dest_folder = os.path.join(
-            save_dir,
-            f"12 Clicks Export {datetime.now().strftime('%d_%m_%Y - %H_%M_%S')}"
+        # picking an earlier export folder updates it in place (only changed files)
+        if ExportManifest.exists_for(save_dir, EXPORT_MANIFEST_DIR):
+            dest_folder = save_dir
+        else:
+            dest_folder = os.path.join(save_dir, export_folder_name())
+
+        job = ExportJob(
+            dest_folder=dest_folder,
+            src_dir=curr_dir,
+            viewer_files=VIEWER_FILES,
+            db_file=DB_FILE,
+            shapes_dir=SHAPES_DIR,
+            cache_dir=EXPORT_CACHE_DIR,
+            manifest_dir=EXPORT_MANIFEST_DIR,
+            writer=self.writer,
+            bundle=bundle,
+            calendar_id=self.repo.calendar_id,
         )
-        os.makedirs(dest_folder, exist_ok=True)
+        ExportDialog(self, job)
 
-        try:
-            # copy information into folder
-            shutil.copy(src_viewer, os.path.join(dest_folder, "viewer.py"))
-
-            shutil.copy(DB_FILE, os.path.join(dest_folder, os.path.basename(DB_FILE)))
-
-            if os.path.isdir(ASSETS_DIR):
-                shutil.copytree(ASSETS_DIR, os.path.join(dest_folder, "assets"))
-
-
-            if os.path.isdir(SHAPES_DIR):
-                shutil.copytree(SHAPES_DIR, os.path.join(dest_folder, "shapes"))
-
-            # --- Create helper scripts (optional) ---
-            bat_path = os.path.join(dest_folder, "windows.bat")
-            with open(bat_path, "w") as bat:
-                bat.write(
-                    "@echo off\n"
-                    "echo Launching Advent Calendar Viewer...\n"
-                    "python viewer.py\n"
-                    "pause\n"
-                )
-
-            sh_path = os.path.join(dest_folder, "mac.sh")
-            with open(sh_path, "w") as sh:
-                sh.write(
-                    "#!/bin/bash\n"
-                    "echo \"Launching Advent Calendar Viewer...\"\n"
-                    "python3 viewer.py\n"
-                )
-            try:
-                os.chmod(sh_path, 0o755)
-            except:
-                pass
-
-
-            system = platform.system()
-            pyinstaller_cmd = shutil.which("pyinstaller")
-
-            if not pyinstaller_cmd:
-                messagebox.showwarning(
-                    "Executable Not Built",
-                    "PyInstaller is not installed.\n\n"
-                    "Export includes viewer.py and run scripts, but no standalone app.\n\n"
-                    "Install PyInstaller to enable automatic .exe/.app creation:\n"
-                    "    pip install pyinstaller"
-                )
-                return
-
-            # Inform user
-            messagebox.showinfo(
-                "Building Executable",
-                "Creating .exe/.app using PyInstaller…\nThis may take 30–60 seconds."
-            )
-
-            # Temporary build folder
-            temp_build_dir = os.path.join(dest_folder, "build_temp")
-            os.makedirs(temp_build_dir, exist_ok=True)
-
-            # Run PyInstaller
-            subprocess.run(
-                [
-                    pyinstaller_cmd,
-                    "--onefile",
-                    "--windowed",
-                    "--name", exe_name.replace(".exe", ""),  # Base name for both .exe and .app
-                    "--distpath", temp_build_dir,
-                    "--workpath", os.path.join(temp_build_dir, "build"),
-                    "--specpath", os.path.join(temp_build_dir, "spec"),
-                    os.path.join(dest_folder, "viewer.py")
-                ],
-                check=False
-            )
-
-
-            if system == "Windows":
-                built_exe = os.path.join(
-                    temp_build_dir,
-                    exe_name  # RUN.exe
-                )
-                if os.path.exists(built_exe):
-                    shutil.move(built_exe, os.path.join(dest_folder, exe_name))
-
-            elif system == "Darwin":  # macOS
-                built_app = os.path.join(
-                    temp_build_dir,
-                    app_name  # RUN.app
-                )
-                if os.path.exists(built_app):
-                    shutil.move(built_app, os.path.join(dest_folder, app_name))
-
-
-            shutil.rmtree(temp_build_dir, ignore_errors=True)
+    # ------------------------------ Door files -------------------------
+    def import_doors(self):
+        """
+        read door messages and images from a JSON Lines / CSV file; runs on
+        the writer thread after any autosave still waiting
+        """
+        from tkinter import filedialog
 
-        except Exception as e:
-            messagebox.showerror("Export error", f"Failed to export files:\n{e}")
+        path = filedialog.askopenfilename(title="Import doors", filetypes=DOOR_FILE_TYPES)
+        if not path:
             return
-
-        # Success message
-        messagebox.showinfo(
-            "Export complete",
-            "Calendar exported successfully\n"
-            "The viewer application has been created!"
+        if "door_editor" in self.pages.pages:
+            self.door_editor.flush_pending()
+        self.set_status("Importing doors...")
+        calendar_id = self.repo.calendar_id
+        self.writer.submit(
+            ("import_doors", calendar_id, path),
+            lambda repo: repo.import_doors(
+                path, calendar_id=calendar_id,
+                resolve_image=lambda door_num, image: store_door_image(image) or image),
+            on_done=self._on_doors_imported
         )
 
+    def _on_doors_imported(self, count, error):
+        if error is not None:
+            self.set_status(f"Import failed: {error}")
+            return
+        image_cache.shared_cache().invalidate()
+        self.set_status(f"{count} doors imported.")
+        if "doors" in self.pages.pages:
+            self.door_grid.refresh()
+        if self.pages.current == "door_editor":
+            self.door_editor.load_data()
+
+    def export_doors(self):
+        """
+        write all door messages and image paths to a JSON Lines / CSV file
+        """
+        from tkinter import filedialog
 
+        path = filedialog.asksaveasfilename(title="Export doors", defaultextension=".jsonl",
+                                            filetypes=DOOR_FILE_TYPES)
+        if not path:
+            return
+        if "door_editor" in self.pages.pages:
+            self.door_editor.flush_pending()
+        calendar_id = self.repo.calendar_id
+        self.writer.submit(
+            ("export_doors", calendar_id, path),
+            lambda repo: repo.export_doors(path, calendar_id=calendar_id),
+            on_done=lambda count, error: self.set_status(
+                f"Export failed: {error}" if error else f"{count} doors written to {os.path.basename(path)}.")
+        )
 
     def on_close(self):
+        # write out anything the autosave hasn't persisted yet
+        if "door_editor" in self.pages.pages:
+            self.door_editor.flush_pending()
+        self.after_cancel(self._poll_id)
+        # close the writer first: its last completions refresh the door grid,
+        # which may still ask the decoder for thumbnails
+        self.writer.close()
+        self.decoder.shutdown()
+        self.thumb_cache.save()
         self.repo.close()
         self.destroy()
 
@@ -378,4 +643,9 @@ class EditorApp(tk.Tk):
 if __name__ == "__main__":
     app = EditorApp()
     app.protocol("WM_DELETE_WINDOW", app.on_close)
+    startup_profile.watch_first_frame(app)
+    if os.environ.get("ADVENT_WATCHDOG", "") not in ("", "0"):
+        import stall_watchdog  # opt-in, only loaded when asked for
+
+        stall_watchdog.start(app)
     app.mainloop()
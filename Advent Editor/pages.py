@@ -0,0 +1,160 @@
+"""
+Retained pages: every page is built once and then raised when needed.
+"""
+import math
+import tkinter as tk
+
+import image_cache
+import tracing
+from ui_helpers import Debouncer
+
+# size at layout scale 1 of what grows with the scale on the tallest page
+# (editor doors page: title image ~120 px + three rows of 210 px doors)
+LAYOUT_SIZE = (900, 760)
+# height of what keeps its pixel size at any scale (tool bars)
+FIXED_HEIGHT = 40
+RESIZE_DELAY_MS = 200
+
+
+def layout_scale(width, height):
+    """
+    largest scale, in steps of 0.25 from 1 to 2, at which the pages still
+    fit into width x height; steps so small resizes don't re-layout anything
+    """
+    scale = min(width / LAYOUT_SIZE[0], (height - FIXED_HEIGHT) / LAYOUT_SIZE[1])
+    return max(1.0, min(2.0, math.floor(scale * 4) / 4))
+
+
+class PageManager:
+    """
+    Keeps one frame per page stacked in the same grid cell.
+    Pages are built the first time they are shown; after that showing a page
+    only calls its refresh(state) hook and raises it, no widgets are created.
+    """
+
+    def __init__(self, container):
+        self.container = container
+        container.grid_rowconfigure(0, weight=1)
+        container.grid_columnconfigure(0, weight=1)
+        self._builders = {}
+        self.pages = {}
+        self.current = None
+        # re-layout once resizing stops, and only when the scale step changes
+        self.scale = 1.0
+        self._rescale_callbacks = []
+        container.bind("<Configure>", Debouncer(container, RESIZE_DELAY_MS, self._on_resize))
+
+    def register(self, name, build, refresh=None):
+        """
+        build(parent) -> frame creates the page,
+        refresh(state) updates only the data-dependent parts
+        """
+        self._builders[name] = (build, refresh)
+
+    def get(self, name):
+        """returns the page frame, building it if needed"""
+        page = self.pages.get(name)
+        if page is None:
+            build, _ = self._builders[name]
+            with tracing.span(f"build page {name}"):
+                page = build(self.container)
+            page.grid(row=0, column=0, sticky="nsew")
+            self.pages[name] = page
+        return page
+
+    def on_rescale(self, callback):
+        """callback(scale) runs after the window settled at another layout scale"""
+        self._rescale_callbacks.append(callback)
+
+    def _on_resize(self, event):
+        scale = layout_scale(event.width, event.height)
+        if scale == self.scale:
+            return
+        self.scale = scale
+        for callback in self._rescale_callbacks:
+            callback(scale)
+
+    def show(self, name, state=None):
+        """refresh and raise the page"""
+        page = self.get(name)
+        _, refresh = self._builders[name]
+        if refresh is not None:
+            with tracing.span(f"refresh page {name}"):
+                refresh(state)
+        page.tkraise()
+        self.current = name
+        return page
+
+
+class ShapeImages:
+    """
+    The decorative shapes on the pages, from a ShapeVariants. Labels made
+    by label() are swapped for the variant of the new layout scale when the
+    window settles. A shape without a pre-scaled variant is resized in the
+    decode pool and shown once it is ready, never resampled on the Tk thread
+    """
+
+    def __init__(self, pages, shapes, decoder):
+        self.shapes = shapes
+        self.decoder = decoder
+        self.scale = pages.scale
+        self._labels = []
+        self._wanted = {}   # label or (canvas, item) -> (file, width) it should show
+        self._photos = {}   # label or (canvas, item) -> PhotoImage shown, keeps the ref
+        pages.on_rescale(self.rescale)
+
+    def label(self, parent, name, width, **kwargs):
+        """label showing a shape, swapped for a larger variant when the window grows"""
+        label = tk.Label(parent, **kwargs)
+        self._labels.append((label, name, width))
+        self._show(label, name, width, self.scale)
+        return label
+
+    def canvas_image(self, canvas, x, y, name, width, **kwargs):
+        """image item showing a shape at layout scale 1"""
+        item = canvas.create_image(x, y, **kwargs)
+        self._show((canvas, item), name, width, 1.0)
+        return item
+
+    def set_shapes(self, shapes):
+        """show the shapes from another ShapeVariants, e.g. after a rebuild"""
+        self.shapes = shapes
+        self.rescale(self.scale)
+
+    def rescale(self, scale):
+        self.scale = scale
+        for label, name, width in self._labels:
+            self._show(label, name, width, scale)
+
+    def _show(self, target, name, width, scale):
+        path, size = self.shapes.source(name, width, scale)
+        self._wanted[target] = (path, size)
+        cache = image_cache.shared_cache()
+        if size is None or cache.contains(path, size):
+            self._set(target, image_cache.get_photo(path, size))
+            return
+
+        def done(image, error):
+            if error is not None:
+                return
+            cache.put_image(path, image, width=size)
+            if self._wanted.get(target) == (path, size):
+                self._set(target, image_cache.get_photo(path, size))
+
+        # the target keeps what it shows until the resized original is ready
+        self.decoder.submit(("shape", path, size), cache.decode, path, size, callback=done)
+
+    def _set(self, target, photo):
+        self._photos[target] = photo
+        if isinstance(target, tuple):
+            canvas, item = target
+            canvas.itemconfigure(item, image=photo)
+        else:
+            target.configure(image=photo)
+
+
+def make_container(root, bg):
+    """frame that fills the window and holds all the pages"""
+    container = tk.Frame(root, bg=bg)
+    container.pack(expand=True, fill="both")
+    return container
@@ -0,0 +1,68 @@
+"""
+Background image decoding for the Tk apps.
+"""
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+
+class DecodePool:
+    """
+    Runs decode jobs on a small thread pool. Finished results are handed to
+    the Tk thread from after() (Tk objects such as PhotoImage must only be
+    made there), and each job is only run once per key.
+    """
+
+    def __init__(self, widget, workers=2, poll_ms=30):
+        self.widget = widget
+        self.poll_ms = poll_ms
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="decode")
+        self._pending = {}      # key -> list of callbacks waiting for it
+        self._done = queue.Queue()
+        self._poll_id = None
+        self._closed = False
+
+    def submit(self, key, fn, *args, callback=None):
+        """
+        run fn(*args) in the pool unless key is already queued.
+        callback(result, error) runs later on the Tk thread.
+        Does nothing once the pool is shut down
+        """
+        if self._closed:
+            return
+        waiting = self._pending.get(key)
+        if waiting is not None:
+            if callback is not None:
+                waiting.append(callback)
+            return
+        self._pending[key] = [callback] if callback is not None else []
+        future = self._executor.submit(fn, *args)
+        future.add_done_callback(lambda f: self._done.put((key, f)))
+        self._schedule()
+
+    def is_pending(self, key):
+        return key in self._pending
+
+    def _schedule(self):
+        if self._poll_id is None:
+            self._poll_id = self.widget.after(self.poll_ms, self._poll)
+
+    def _poll(self):
+        self._poll_id = None
+        while True:
+            try:
+                key, future = self._done.get_nowait()
+            except queue.Empty:
+                break
+            error = future.exception()
+            result = None if error else future.result()
+            for callback in self._pending.pop(key, []):
+                callback(result, error)
+        if self._pending:
+            self._schedule()
+
+    def shutdown(self):
+        self._closed = True
+        if self._poll_id is not None:
+            self.widget.after_cancel(self._poll_id)
+            self._poll_id = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,140 @@
+"""
+Pre-scaled variants of the decorative images in shapes/.
+
+The full-size PNGs are resized once per use site and screen scale (1x, 1.5x,
+2x) into shapes/scaled/, with a manifest listing them. The editor refreshes
+them at startup when a source changed and again on export; the viewer only
+reads the manifest and shows the nearest variant as is, without resampling
+(see pages.ShapeImages).
+"""
+import json
+import os
+
+from PIL import Image
+
+import image_cache
+from tracing import traced
+
+# shape -> widths it is shown at (see show_background_images / welcome pages)
+SHAPE_WIDTHS = {
+    "tree.png": (300,),
+    "star.png": (400,),
+    "welcome_text.png": (600,),
+    "edit_calendar.png": (600,),
+    "pears.png": (400,),
+    "dove.png": (300,),
+}
+SCALES = (1, 1.5, 2)
+VARIANT_DIR = "scaled"
+MANIFEST_NAME = "manifest.json"
+
+
+def variant_name(name, width, scale):
+    return f"{os.path.splitext(name)[0]}_{width}@{scale:g}x.png"
+
+
+@traced("shape_variants.build")
+def build(shapes_dir, widths=SHAPE_WIDTHS, scales=SCALES):
+    """
+    write variants whose source changed (or that are missing) and the
+    manifest; returns how many images were written
+    """
+    out_dir = os.path.join(shapes_dir, VARIANT_DIR)
+    os.makedirs(out_dir, exist_ok=True)
+    manifest_path = os.path.join(out_dir, MANIFEST_NAME)
+    try:
+        with open(manifest_path, encoding="utf-8") as f:
+            old = json.load(f)
+    except (OSError, ValueError):
+        old = {}
+
+    sources = {}
+    variants = {}
+    written = 0
+    for name, sizes in sorted(widths.items()):
+        src = os.path.join(shapes_dir, name)
+        if not os.path.exists(src):
+            continue
+        st = os.stat(src)
+        sources[name] = [st.st_size, st.st_mtime_ns]
+        fresh = old.get("sources", {}).get(name) == sources[name]
+        img = None
+        for width in sizes:
+            entry = variants[f"{name}@{width}"] = {}
+            for scale in scales:
+                vname = entry[f"{scale:g}"] = variant_name(name, width, scale)
+                dest = os.path.join(out_dir, vname)
+                if fresh and os.path.exists(dest):
+                    continue
+                if img is None:
+                    img = Image.open(src)
+                    img.load()
+                w = round(width * scale)
+                h = max(1, round(img.height * w / img.width))
+                img.resize((w, h), Image.Resampling.LANCZOS).save(dest + ".partial", "PNG")
+                os.replace(dest + ".partial", dest)
+                written += 1
+
+    # drop variants of sizes that are no longer used
+    keep = {v for entry in variants.values() for v in entry.values()} | {MANIFEST_NAME}
+    for stale in set(os.listdir(out_dir)) - keep:
+        os.remove(os.path.join(out_dir, stale))
+
+    manifest = {"sources": sources, "variants": variants}
+    if manifest != old:
+        with open(manifest_path + ".partial", "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=1, sort_keys=True)
+        os.replace(manifest_path + ".partial", manifest_path)
+    return written
+
+
+def display_scale(widget):
+    """screen scale relative to a 96 dpi display"""
+    return widget.winfo_fpixels("1i") / 96
+
+
+class ShapeVariants:
+    """
+    Picks the variant for the current scale. Reads through image_cache's
+    source, so it works for loose files and for calendar bundles alike.
+    """
+
+    def __init__(self, shapes_dir, scale=1.0):
+        self.shapes_dir = shapes_dir
+        self.scale = scale
+        self.variants = {}
+        manifest = os.path.join(shapes_dir, VARIANT_DIR, MANIFEST_NAME)
+        if image_cache.image_exists(manifest):
+            try:
+                self.variants = json.loads(_read(manifest))["variants"]
+            except (OSError, ValueError, KeyError):
+                pass  # fall back to resizing the originals
+
+    def path(self, name, width, scale=1.0):
+        """
+        pre-scaled file for name shown at width, or None. scale is the
+        layout scale of the window on top of the screen scale
+        """
+        entry = self.variants.get(f"{name}@{width}")
+        if not entry:
+            return None
+        nearest = min(entry, key=lambda s: abs(float(s) - self.scale * scale))
+        return os.path.join(self.shapes_dir, VARIANT_DIR, entry[nearest])
+
+    def source(self, name, width, scale=1.0):
+        """
+        (file, width to resize it to) for name shown at width: the variant
+        as is (width None), or the original if there is no variant
+        """
+        path = self.path(name, width, scale)
+        if path and image_cache.image_exists(path):
+            return path, None
+        return os.path.join(self.shapes_dir, name), round(width * scale)
+
+
+def _read(path):
+    f = image_cache.shared_cache().source.open(path)
+    if isinstance(f, str):
+        f = open(f, "rb")
+    with f:
+        return f.read()
@@ -0,0 +1,87 @@
+"""
+Rounded shapes (cards, doors, pill buttons) rendered once with PIL.
+
+Tk redraws a smoothed polygon by tessellating it on every page build; a
+sprite is rasterized with antialiasing once per (shape, size, colour, scale)
+and then placed as a single canvas image. Rendered sprites are memoized in
+memory and, if use_disk_cache() was called, kept as PNGs between runs.
+"""
+import os
+import re
+
+from PIL import Image, ImageDraw, ImageTk
+
+from tracing import traced
+
+# shapes are drawn this many times larger, then reduced, for smooth edges
+SUPERSAMPLE = 4
+
+_images = {}   # key -> PIL image
+_photos = {}   # key -> PhotoImage, kept alive while the app runs
+_disk_dir = None
+
+
+def use_disk_cache(folder):
+    """keep rendered sprites as PNGs in folder (None turns it off)"""
+    global _disk_dir
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    _disk_dir = folder
+
+
+def _key(width, height, radius, fill, outline, scale):
+    return (int(width), int(height), int(radius), fill or "", outline or "", scale)
+
+
+def _disk_path(key):
+    name = "_".join(re.sub(r"[^0-9A-Za-z.]", "", str(part)) or "none" for part in key)
+    return os.path.join(_disk_dir, f"sprite_{name}.png")
+
+
+def render(width, height, radius, fill, outline=None, scale=1):
+    """
+    PIL image of a rounded rectangle width x height (times scale) with
+    corner radius radius; outline draws a 1px border in another colour
+    """
+    key = _key(width, height, radius, fill, outline, scale)
+    image = _images.get(key)
+    if image is not None:
+        return image
+
+    path = _disk_path(key) if _disk_dir else None
+    if path and os.path.exists(path):
+        with Image.open(path) as img:
+            img.load()
+            image = img.copy()
+    else:
+        image = _draw(*key)
+        if path:
+            image.save(path + ".partial", "PNG")
+            os.replace(path + ".partial", path)
+    _images[key] = image
+    return image
+
+
+@traced("sprites.render")
+def _draw(width, height, radius, fill, outline, scale):
+    k = SUPERSAMPLE
+    w, h = max(1, round(width * scale)), max(1, round(height * scale))
+    img = Image.new("RGBA", (w * k, h * k), (0, 0, 0, 0))
+    border = outline if outline and outline != fill else None
+    ImageDraw.Draw(img).rounded_rectangle(
+        (0, 0, w * k - 1, h * k - 1),
+        radius=min(radius * scale, w / 2, h / 2) * k,
+        fill=fill or None,
+        outline=border,
+        width=k if border else 0,
+    )
+    return img.reduce(k)
+
+
+def photo(width, height, radius, fill, outline=None, scale=1):
+    """memoized PhotoImage of render() (needs a Tk root)"""
+    key = _key(width, height, radius, fill, outline, scale)
+    tkimg = _photos.get(key)
+    if tkimg is None:
+        tkimg = _photos[key] = ImageTk.PhotoImage(render(width, height, radius, fill, outline, scale))
+    return tkimg
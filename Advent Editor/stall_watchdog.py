@@ -0,0 +1,129 @@
+"""
+Opt-in detector for callbacks that block the Tk event loop.
+
+With ADVENT_WATCHDOG=1 (report in stall_report.txt) or ADVENT_WATCHDOG=<file>,
+an after() tick runs every TICK_MS and records how late it fired. A sampling
+thread grabs the main thread's stack while a tick is overdue, so each logged
+stall shows where the UI thread was stuck. A histogram of the lateness is
+appended to the report on exit.
+"""
+import atexit
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+
+import tracing
+
+_setting = os.environ.get("ADVENT_WATCHDOG", "")
+ENABLED = _setting not in ("", "0")
+REPORT_FILE = "stall_report.txt" if _setting in ("", "0", "1") else _setting
+
+TICK_MS = 50
+THRESHOLD_MS = 200
+# upper bounds of the histogram buckets, in ms
+BUCKETS_MS = (16, 50, 100, 250, 500, 1000, 5000)
+
+
+class StallWatchdog:
+    def __init__(self, root, report_path=REPORT_FILE, tick_ms=TICK_MS, threshold_ms=THRESHOLD_MS):
+        self.root = root
+        self.tick_ms = tick_ms
+        self.threshold = threshold_ms / 1000
+        self.histogram = [0] * (len(BUCKETS_MS) + 1)
+        self.stalls = 0
+        self.worst = 0.0
+        self._main_id = threading.get_ident()  # Tk runs on the thread that made root
+        self._lock = threading.Lock()
+        self._samples = []      # stacks sampled during the current stall
+        self._due = None        # when the pending tick should fire
+        self._after_id = None
+        self._stop = threading.Event()
+        self._sampler = threading.Thread(target=self._sample_loop, name="stall-watchdog", daemon=True)
+        self._report = open(report_path, "w", encoding="utf-8")
+
+    def start(self):
+        self._schedule(time.perf_counter())
+        self._sampler.start()
+        atexit.register(self.stop)
+        return self
+
+    # ------------------------------ Tk thread ------------------------------
+    def _schedule(self, now):
+        with self._lock:
+            self._due = now + self.tick_ms / 1000
+        self._after_id = self.root.after(self.tick_ms, self._tick)
+
+    def _tick(self):
+        now = time.perf_counter()
+        with self._lock:
+            late = max(0.0, now - self._due)
+            samples, self._samples = self._samples, []
+        self.histogram[_bucket(late * 1000)] += 1
+        if late >= self.threshold:
+            self._log_stall(late, samples)
+        self._schedule(now)
+
+    def _log_stall(self, late, samples):
+        self.stalls += 1
+        self.worst = max(self.worst, late)
+        tracing.count("tk stalls")
+        lines = [f"stall: after() tick {late * 1000:.0f} ms late"]
+        if not samples:
+            lines.append("  (no stack sampled)")
+        for stack, n in Counter(samples).most_common():
+            lines.append(f"  main thread in ({n} of {len(samples)} samples):")
+            lines.append(stack.rstrip("\n"))
+        self._report.write("\n".join(lines) + "\n\n")
+        self._report.flush()
+
+    # ------------------------------ sampler ------------------------------
+    def _sample_loop(self):
+        while not self._stop.wait(self.threshold / 2):
+            with self._lock:
+                overdue = self._due is not None and time.perf_counter() - self._due >= self.threshold
+            if not overdue:
+                continue
+            frame = sys._current_frames().get(self._main_id)
+            if frame is None:
+                continue
+            stack = "".join(traceback.format_stack(frame))
+            with self._lock:
+                self._samples.append(stack)
+
+    # ------------------------------ summary ------------------------------
+    def stop(self):
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        try:
+            self.root.after_cancel(self._after_id)
+        except Exception:
+            pass  # the window is already gone
+        total = sum(self.histogram)
+        lines = [f"after() lateness over {total} ticks, {self.stalls} stalls "
+                 f"over {self.threshold * 1000:.0f} ms, worst {self.worst * 1000:.0f} ms"]
+        low = 0
+        for high, n in zip(BUCKETS_MS + (None,), self.histogram):
+            label = f"{low}-{high} ms" if high else f">{low} ms"
+            bar = "#" * (round(40 * n / total) if total else 0)
+            lines.append(f"  {label:>12} {n:>8}  {bar}".rstrip())
+            low = high
+        self._report.write("\n".join(lines) + "\n")
+        self._report.close()
+
+
+def _bucket(ms):
+    for i, high in enumerate(BUCKETS_MS):
+        if ms < high:
+            return i
+    return len(BUCKETS_MS)
+
+
+def start(root):
+    """start a watchdog on root when ADVENT_WATCHDOG is set, else None"""
+    if not ENABLED:
+        return None
+    return StallWatchdog(root).start()
@@ -0,0 +1,70 @@
+"""
+--profile-startup: wall time of each startup phase of the editor / viewer.
+
+Import this module first; phases are measured from that point. The report
+goes to stderr, or to startup_profile.txt when there is no console (the
+windowed RUN.exe).
+"""
+import os
+import sys
+import time
+
+ENABLED = "--profile-startup" in sys.argv
+_start = time.perf_counter()
+_marks = []
+
+
+def mark(phase):
+    """end of a startup phase"""
+    if ENABLED:
+        _marks.append((phase, time.perf_counter()))
+
+
+def mark_first_call(module, name, phase):
+    """mark phase once module.name() returns for the first time"""
+    if not ENABLED:
+        return
+    fn = getattr(module, name)
+
+    def first_call(*args, **kwargs):
+        setattr(module, name, fn)
+        result = fn(*args, **kwargs)
+        mark(phase)
+        return result
+
+    setattr(module, name, first_call)
+
+
+def watch_first_frame(root):
+    """mark the first time root is mapped on screen, then report"""
+    if not ENABLED:
+        return
+
+    def on_map(event):
+        if event.widget is root:
+            root.unbind("<Map>", bind_id)
+            # wait for the pending redraws so the frame is actually drawn
+            root.update_idletasks()
+            mark("first frame mapped")
+            report()
+
+    bind_id = root.bind("<Map>", on_map, add="+")
+
+
+def report():
+    lines = [f"{'phase':<24}{'ms':>9}{'total ms':>10}"]
+    prev = _start
+    for phase, t in _marks:
+        lines.append(f"{phase:<24}{(t - prev) * 1000:>9.1f}{(t - _start) * 1000:>10.1f}")
+        prev = t
+    text = "startup profile\n" + "\n".join(lines) + "\n"
+    if sys.stderr is not None:
+        sys.stderr.write(text)
+    else:
+        with open(os.path.join(os.getcwd(), "startup_profile.txt"), "w") as f:
+            f.write(text)
+
+
+def args():
+    """command line arguments without the profiling flag"""
+    return [a for a in sys.argv[1:] if a != "--profile-startup"]
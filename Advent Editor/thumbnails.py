@@ -0,0 +1,58 @@
+"""
+On-disk cache of small door previews for the editor grid.
+
+Thumbnails are keyed by the sha256 of the source image and the thumbnail
+size, so a preview is only made again when the door image actually changes.
+Loading runs on a worker thread (see prefetch.DecodePool).
+"""
+import os
+import threading
+
+from PIL import Image
+
+from export_cache import HashCache
+from tracing import traced
+
+
+class ThumbnailCache:
+    """
+    cache_dir/<hash>_<w>x<h>.png for every door image seen so far
+    """
+
+    def __init__(self, cache_dir, size):
+        self.cache_dir = cache_dir
+        self.size = tuple(size)
+        self._hashes = HashCache(cache_dir)
+        self._lock = threading.Lock()  # HashCache is shared by the workers
+
+    def path_for(self, src_path, size=None):
+        with self._lock:
+            digest = self._hashes.digest(src_path)
+        w, h = size or self.size
+        return os.path.join(self.cache_dir, f"{digest[:32]}_{w}x{h}.png")
+
+    @traced()
+    def load(self, src_path, size=None):
+        """
+        thumbnail of src_path as a PIL image, made and stored on first use.
+        size: (w, h) box instead of the default, e.g. for a scaled grid
+        """
+        size = tuple(size or self.size)
+        path = self.path_for(src_path, size)
+        if not os.path.exists(path):
+            with Image.open(src_path) as img:
+                img.draft("RGB", size)  # JPEG: decode at reduced scale
+                if img.mode not in ("RGB", "RGBA"):
+                    img = img.convert("RGBA")
+                img.thumbnail(size, Image.Resampling.LANCZOS)
+                # two doors may share an image, so the temp name is per thread
+                tmp = f"{path}.{threading.get_ident()}.partial"
+                img.save(tmp, "PNG")
+            os.replace(tmp, path)
+        with Image.open(path) as img:
+            img.load()
+            return img.copy()
+
+    def save(self):
+        with self._lock:
+            self._hashes.save()
@@ -0,0 +1,123 @@
+"""
+Opt-in tracing of the hot paths, written as Chrome trace JSON on exit.
+
+Set ADVENT_TRACE=1 (trace written to advent_trace.json) or ADVENT_TRACE=<file>
+before starting the editor or viewer, then open the file in chrome://tracing
+or https://ui.perfetto.dev. When the variable is not set, traced() returns
+the function unchanged and span()/count() return right away, and nothing
+but os is imported.
+"""
+import os
+
+_setting = os.environ.get("ADVENT_TRACE", "")
+ENABLED = _setting not in ("", "0")
+TRACE_FILE = "advent_trace.json" if _setting in ("", "0", "1") else _setting
+
+if ENABLED:
+    import atexit
+    import functools
+    import json
+    import threading
+    import time
+
+_events = []        # list.append is atomic, spans may end on any thread
+_counters = {}
+_counter_lock = threading.Lock() if ENABLED else None
+_threads = {}       # thread id -> name, for the trace viewer's track names
+_pid = os.getpid()
+
+
+def _now_us():
+    return time.perf_counter_ns() / 1000
+
+
+def _complete(name, start_us, args=None):
+    tid = threading.get_ident()
+    if tid not in _threads:
+        _threads[tid] = threading.current_thread().name
+    event = {"name": name, "ph": "X", "ts": start_us, "dur": _now_us() - start_us,
+             "pid": _pid, "tid": tid}
+    if args:
+        event["args"] = args
+    _events.append(event)
+
+
+class _Span:
+    __slots__ = ("name", "args", "start")
+
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = _now_us()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _complete(self.name, self.start, self.args)
+        return False
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+def span(name, **args):
+    """
+    with span("load doors", first=1):
+        ...
+    spans opened inside it show up nested under it
+    """
+    if not ENABLED:
+        return _NO_SPAN
+    return _Span(name, args)
+
+
+def traced(name=None):
+    """decorator: a span around every call, named after the function"""
+    def wrap(fn):
+        if not ENABLED:
+            return fn
+        label = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            start = _now_us()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                _complete(label, start)
+        return inner
+    return wrap
+
+
+def count(name, n=1):
+    """add n to a counter (shown as a graph in the trace)"""
+    if not ENABLED:
+        return
+    with _counter_lock:
+        value = _counters[name] = _counters.get(name, 0) + n
+    _events.append({"name": name, "ph": "C", "ts": _now_us(), "pid": _pid,
+                    "args": {"value": value}})
+
+
+def dump(path=None):
+    """write the trace collected so far"""
+    meta = [{"name": "thread_name", "ph": "M", "pid": _pid, "tid": tid, "args": {"name": name}}
+            for tid, name in list(_threads.items())]
+    with open(path or TRACE_FILE, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": meta + list(_events), "displayTimeUnit": "ms",
+                   "otherData": {"counters": dict(_counters)}}, f)
+
+
+if ENABLED:
+    atexit.register(dump)
@@ -1,25 +1,42 @@
-import tkinter as tk
-
-def round_rect(canvas, x1, y1, x2, y2, r=35, **kwargs):
-    points = [
-        x1+r, y1,
-        x2-r, y1,
-        x2, y1,
-        x2, y1+r,
-        x2, y2-r,
-        x2, y2,
-        x2-r, y2,
-        x1+r, y2,
-        x1, y2,
-        x1, y2-r,
-        x1, y1+r,
-        x1, y1
-    ]
-    return canvas.create_polygon(points, smooth=True, **kwargs)
-
-
-def pill(canvas, x1, y1, x2, y2, **kwargs):
-    r = (y2 - y1) // 2
-    canvas.create_oval(x1, y1, x1 + 2*r, y2, **kwargs)
-    canvas.create_oval(x2 - 2*r, y1, x2, y2, **kwargs)
-    canvas.create_rectangle(x1 + r, y1, x2 - r, y2, **kwargs)
+import sprites
+
+
+def round_rect(canvas, x1, y1, x2, y2, r=35, fill="", outline="", tags=(), **kwargs):
+    """
+    rounded rectangle as one pre-rendered image item. The corners match the
+    smoothed polygon this used to draw, whose curves have radius r / 2
+    """
+    image = sprites.photo(x2 - x1, y2 - y1, r / 2, fill, outline)
+    return canvas.create_image(x1, y1, image=image, anchor="nw", tags=tags, **kwargs)
+
+
+def pill(canvas, x1, y1, x2, y2, fill="", outline="", tags=(), **kwargs):
+    image = sprites.photo(x2 - x1, y2 - y1, (y2 - y1) // 2, fill, outline)
+    return canvas.create_image(x1, y1, image=image, anchor="nw", tags=tags, **kwargs)
+
+
+class Debouncer:
+    """
+    debounced = Debouncer(widget, 200, fn)
+    debounced(*args) calls fn(*args) once, delay_ms after the last call,
+    e.g. once a drag-resize stops instead of on every <Configure>
+    """
+
+    def __init__(self, widget, delay_ms, fn):
+        self.widget = widget
+        self.delay_ms = delay_ms
+        self.fn = fn
+        self._after_id = None
+
+    def __call__(self, *args):
+        self.cancel()
+        self._after_id = self.widget.after(self.delay_ms, self._fire, *args)
+
+    def _fire(self, *args):
+        self._after_id = None
+        self.fn(*args)
+
+    def cancel(self):
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+            self._after_id = None
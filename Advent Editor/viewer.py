@@ -1,10 +1,24 @@
+import startup_profile  # first, so the import phase is measured
 import tkinter as tk
 from tkinter import ttk, messagebox
 from tkinter.scrolledtext import ScrolledText
 import sqlite3
 from datetime import date, timedelta
 import os
-from PIL import Image, ImageTk
+
+import image_cache
+from pages import PageManager, ShapeImages, make_container
+from door_grid import DoorGrid
+from advent_dates import DEFAULT_DOOR_COUNT, door_dates, door_unlock_date, first_unlock_date
+from bundle import BUNDLE_NAME, BundleReader, BundleSource
+from prefetch import DecodePool
+from ui_helpers import round_rect, pill
+from shape_variants import ShapeVariants, display_scale
+from viewer_state import ViewerState
+from tracing import traced
+
+startup_profile.mark("imports")
+startup_profile.mark_first_call(image_cache, "_load", "first image decode")
 
 DB_FILE = "advent.db"
 
@@ -19,8 +33,16 @@ PEACH = "#dba582"
 WIDTH = 760
 HEIGHT = 360
 
-# door 1 -> Dec 13, door 12 -> Dec 24
-DOOR_DATES = [(13 + i) for i in range(12)]
+# door images are shown inside this box
+DOOR_IMAGE_BOX = (400, 300)
+# how many of the most recently unlocked doors get decoded ahead of time
+PREFETCH_LIMIT = 24
+
+# memory map the content database instead of reading it through the page cache
+MMAP_SIZE = 64 * 1024 * 1024
+
+# default calendar: door 1 -> Dec 13, door 12 -> Dec 24
+DOOR_DATES = door_dates(DEFAULT_DOOR_COUNT)
 
 
 def ensure_db_present():
@@ -29,86 +51,157 @@ def ensure_db_present():
         c = conn.cursor()
         c.execute("""CREATE TABLE IF NOT EXISTS viewer (id INTEGER PRIMARY KEY, name TEXT)""")
         c.execute("""CREATE TABLE IF NOT EXISTS door (id INTEGER PRIMARY KEY, door_num INTEGER UNIQUE, date_day INTEGER, message TEXT, image_path TEXT)""")
+        c.execute("""CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT)""")
         for i, day in enumerate(DOOR_DATES, start=1):
             c.execute("INSERT OR IGNORE INTO door(door_num, date_day, message, image_path) VALUES (?, ?, ?, ?)",
                       (i, day, None, None))
         conn.commit()
         conn.close()
 
+
+def connect_readonly(path):
+    """
+    read-only connection to the calendar content. immutable=1 skips locking
+    and journal checks, so the file can sit on read-only media; a database
+    the editor still has open in WAL mode is only opened read-only
+    """
+    abspath = os.path.abspath(path).replace(os.sep, "/")
+    if not abspath.startswith("/"):
+        abspath = "/" + abspath  # c:/... on windows
+    # the only characters the URI parser of sqlite treats specially in a path
+    for char, escaped in (("%", "%25"), ("?", "%3F"), ("#", "%23")):
+        abspath = abspath.replace(char, escaped)
+    uri = f"file://{abspath}?mode=ro"
+    if not os.path.exists(path + "-wal"):
+        uri += "&immutable=1"
+    conn = sqlite3.connect(uri, uri=True)
+    conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+    return conn
+
+
+def connect_bundle_db(data):
+    """
+    sqlite connection over the database stored inside a bundle
+    """
+    conn = sqlite3.connect(":memory:")
+    if hasattr(conn, "deserialize"):  # python 3.11+
+        conn.deserialize(data)
+        conn.execute("PRAGMA query_only=1")
+        return conn
+    conn.close()
+    import atexit
+    import tempfile
+
+    fd, path = tempfile.mkstemp(suffix=".db")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    conn = connect_readonly(path)
+    # still open while the viewer runs (windows can't delete it then)
+    atexit.register(_remove_temp_db, conn, path)
+    return conn
+
+
+def _remove_temp_db(conn, path):
+    conn.close()
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def door_image_ref(image_path):
+    """
+    door images live in assets/ next to the viewer. Older databases stored
+    the editor's absolute path, so only the file name of those is kept
+    """
+    if image_path and os.path.isabs(image_path):
+        return os.path.join(ASSETS_DIR, os.path.basename(image_path))
+    return image_path
+
+
 class ViewerApp(tk.Tk):
     """
     Class to run app that viewer can use to see calendar
     """
-    def __init__(self):
+    def __init__(self, bundle_path=None):
         super().__init__()
+        startup_profile.mark("Tk init")
         self.title("12 CLICKS - Viewer")
         self.geometry("900x700")
         self.configure(bg="#809059")
-        ensure_db_present()
-        self.conn = sqlite3.connect(DB_FILE)
+        self.bundle = None
+        self.open_calendar(bundle_path or BUNDLE_NAME)
+        startup_profile.mark("DB open")
+        # shapes come pre-scaled from the export, picked for this screen
+        self.shapes = ShapeVariants("shapes", display_scale(self))
+        self.decoder = DecodePool(self)
+        self.shown_door = None
+        self.shown_image = None
         self._load_fonts()
-        self.sim_day_offset = 0  # 0 means real current date
+        self.sim_day_offset = self.state.sim_day_offset  # 0 means real current date
         self.load_viewer_name()
-        self._build_ui()
+        self.load_door_count()
+        self._register_pages()
+        self.pages.show("welcome")
+
+    def open_calendar(self, bundle_path):
+        """
+        use the single-file bundle if there is one, otherwise the loose
+        advent.db / assets / shapes folder layout
+        """
+        if os.path.exists(bundle_path):
+            self.bundle = BundleReader(bundle_path)
+            image_cache.use_source(BundleSource(self.bundle))
+            self.conn = connect_bundle_db(self.bundle.read(DB_FILE))
+            self.state = ViewerState(bundle_path)
+        else:
+            ensure_db_present()
+            self.conn = connect_readonly(DB_FILE)
+            self.state = ViewerState(DB_FILE)
 
     def _load_fonts(self):
         self.title_font = ("Slight", 32, "bold")
         self.small_font = ("Georgia", 16, "bold")
 
-    def clear_frame(self):
-        for widget in self.winfo_children():
-            widget.destroy()
-
+    def _register_pages(self):
+        """
+        each page is built once and raised afterwards
+        """
+        self.pages = PageManager(make_container(self, GREEN))
+        self.shape_images = ShapeImages(self.pages, self.shapes, self.decoder)
+        self.pages.on_rescale(self._rescale)
+        self.pages.register("welcome", self._build_ui)
+        self.pages.register("doors", self._build_doors_page, self._refresh_doors_page)
+        self.pages.register("door_content", self._build_door_content, self._refresh_door_content)
+
+    @traced()
     def show_background_images(self, root):
         """
         Shows background images of dove and pears
         """
-        pear_img = Image.open("shapes/pears.png")
-        pear_img = pear_img.resize((400, int(pear_img.height * 400 / pear_img.width)), Image.Resampling.LANCZOS)
-        self.pear_img = ImageTk.PhotoImage(pear_img)
-
-        pear_label = tk.Label(root, image=self.pear_img, bg=GREEN, borderwidth=0, highlightthickness=0)
+        pear_label = self.shape_images.label(root, "pears.png", 400, bg=GREEN, borderwidth=0, highlightthickness=0)
         pear_label.place(x=10, rely=1.0, anchor="sw")   # bottom-left
 
-        dove_img = Image.open("shapes/dove.png")
-        dove_img = dove_img.resize((300, int(dove_img.height * 300 / dove_img.width)), Image.Resampling.LANCZOS)
-        self.dove_img = ImageTk.PhotoImage(dove_img)
-
-        dove_label = tk.Label(root, image=self.dove_img, bg=GREEN, borderwidth=0, highlightthickness=0)
+        dove_label = self.shape_images.label(root, "dove.png", 300, bg=GREEN, borderwidth=0, highlightthickness=0)
         dove_label.place(relx=1.0, y=20, anchor="ne")   # top-right
-        
-    def round_rect(self, canvas, x1, y1, x2, y2, r=35, **kwargs):
-        points = [
-            x1+r, y1,
-            x2-r, y1,
-            x2, y1,
-            x2, y1+r,
-            x2, y2-r,
-            x2, y2,
-            x2-r, y2,
-            x1+r, y2,
-            x1, y2,
-            x1, y2-r,
-            x1, y1+r,
-            x1, y1
-        ]
-        return canvas.create_polygon(points, smooth=True, **kwargs)
-
-    def pill(self, canvas, x1, y1, x2, y2, **kwargs):
-        r = (y2 - y1) // 2
-        canvas.create_oval(x1, y1, x1 + 2*r, y2, **kwargs)
-        canvas.create_oval(x2 - 2*r, y1, x2, y2, **kwargs)
-        canvas.create_rectangle(x1 + r, y1, x2 - r, y2, **kwargs)
-
-
-    def _build_ui(self):
-        root = tk.Frame(self, bg=GREEN)
-        root.pack(expand=True, fill="both")
+
+    def _rescale(self, scale):
+        """
+        window settled at another size: a resized door grid and the open
+        door's image at the new size (the shapes swap themselves, see ShapeImages)
+        """
+        if "doors" in self.pages.pages:
+            self.door_grid.set_scale(scale)
+        if self.pages.current == "door_content" and self.shown_door is not None:
+            self._show_door_image(self.shown_door, self.shown_image)
+
+    def _build_ui(self, parent):
+        root = tk.Frame(parent, bg=GREEN)
         self.show_background_images(root)
 
         card = tk.Canvas(root, width=760, height=360, bg=GREEN, highlightthickness=0)
         card.pack(pady=40)
-        self.round_rect(card, 20, 20, 740, 340, r=45, fill=PEACH, outline=PEACH)
+        round_rect(card, 20, 20, 740, 340, r=45, fill=PEACH, outline=PEACH)
 
         card.create_text(
             WIDTH/2, 60,
@@ -117,14 +210,11 @@ class ViewerApp(tk.Tk):
             fill="white"
         )
 
-        img = Image.open("shapes/welcome_text.png")
-        img = img.resize((600, int(img.height * 600 / img.width)), Image.Resampling.LANCZOS)
-        self.welcome_img = ImageTk.PhotoImage(img)
-
-        card.create_image(
+        self.shape_images.canvas_image(
+            card,
             WIDTH/2,           # center X of canvas (760 / 2)
             180,           # center vertically within card
-            image=self.welcome_img
+            "welcome_text.png", 600
         )
 
         card.create_text(
@@ -137,7 +227,7 @@ class ViewerApp(tk.Tk):
         # Button
         btn_holder = tk.Canvas(root, width=230, height=70, bg=GREEN, highlightthickness=0)
         btn_holder.pack()
-        self.pill(btn_holder, 10, 10, 220, 60, fill=PEACH, outline=PEACH)
+        pill(btn_holder, 10, 10, 220, 60, fill=PEACH, outline=PEACH)
         text_id = btn_holder.create_text(
             115, 35,
             text="OPEN",
@@ -145,8 +235,7 @@ class ViewerApp(tk.Tk):
             font=("Georgia", 16, "bold")
         )
         btn_holder.bind("<Button-1>", lambda e: self.show_doors_page())
-
-
+        return root
 
     def _update_current_date_display(self):
         today = date.today() + timedelta(days=self.sim_day_offset)
@@ -165,6 +254,7 @@ class ViewerApp(tk.Tk):
             return "rd"
         return "th"
 
+    @traced()
     def load_viewer_name(self):
         c = self.conn.cursor()
         c.execute("SELECT name FROM viewer LIMIT 1")
@@ -172,11 +262,22 @@ class ViewerApp(tk.Tk):
         name = row[0] if row and row[0] else "YOUR"
         self.viewer_name = name
 
+    @traced()
+    def load_door_count(self):
+        c = self.conn.cursor()
+        try:
+            c.execute("SELECT value FROM settings WHERE key = 'door_count'")
+            row = c.fetchone()
+        except sqlite3.OperationalError:
+            # calendars exported before door counts existed have no settings
+            row = None
+        self.door_count = int(row[0]) if row else DEFAULT_DOOR_COUNT
+
     def show_doors_page(self):
-        self.clear_frame()
+        self.pages.show("doors")
 
-        root = tk.Frame(self, bg=GREEN)
-        root.pack(expand=True, fill="both")
+    def _build_doors_page(self, parent):
+        root = tk.Frame(parent, bg=GREEN)
         self.show_background_images(root)
 
         # Title canvas for testing
@@ -185,31 +286,79 @@ class ViewerApp(tk.Tk):
         tk.Label(test_frame, text="TODAY'S DATE:", bg="#809059", fg="white"
                  ).pack(side="left", padx=8)
         self.curr_date_var = tk.StringVar()
-        self._update_current_date_display()
         self.curr_date_lbl = tk.Label(test_frame, textvariable=self.curr_date_var, bg=GREEN, fg="white")
         self.curr_date_lbl.pack(side="left")
 
         ttk.Button(test_frame, text="Increment day", command=self.increment_day
                    ).pack(side="left", padx=6)
-        grid = tk.Frame(root, bg="#809059")
-        grid.pack(expand=True)
-
-        indent_x = 20
-
-        for i in range(12):
-            r = i // 4
-            c = i % 4
-            doornum = i + 1
+        self.door_grid = DoorGrid(
+            root, self.door_count, self.attempt_open_door,
+            bg=GREEN, fill=PEACH, outline=PEACH, padx=20, pady=15,
+            visible_rows=3, max_cols=4, load_page=self._load_door_page
+        )
+        self.door_grid.set_scale(self.pages.scale)
+        self.door_grid.pack(expand=True)
+        return root
 
-            btn_canvas = tk.Canvas(grid, width=180, height=180, bg=GREEN, highlightthickness=0)
-            btn_canvas.grid(row=r, column=c, padx=indent_x, pady=15)
+    @traced()
+    def _load_door_page(self, doors):
+        """
+        message and image for a block of doors, read in one query
+        """
+        c = self.conn.cursor()
+        c.execute("SELECT door_num, message, image_path FROM door WHERE door_num BETWEEN ? AND ?",
+                  (doors.start, doors.stop - 1))
+        return {door_num: {"message": message, "image_path": image_path,
+                           "badge": "✓" if door_num in self.state.opened else ""}
+                for door_num, message, image_path in c}
 
-            self.round_rect(btn_canvas, 10, 10, 170, 170, r=40, fill=PEACH, outline=PEACH)
-            btn_canvas.create_text(90, 90, text=str(doornum),
-                                    fill="white", font=("Georgia", 32, "bold"))
+    def _refresh_doors_page(self, state):
+        self._update_current_date_display()
+        self._prefetch_door_images()
 
-            btn_canvas.bind("<Button-1>", lambda e, dn=doornum: self.attempt_open_door(dn))
+    # ------------------------------ door images ------------------------------
+    def door_image_box(self):
+        """size door images are shown at for the current window size"""
+        scale = self.pages.scale
+        return (round(DOOR_IMAGE_BOX[0] * scale), round(DOOR_IMAGE_BOX[1] * scale))
 
+    @traced()
+    def _prefetch_door_images(self):
+        """
+        decode the images of the unlocked doors and the next one to unlock
+        in the background, so opening a door doesn't wait on the disk
+        """
+        first = first_unlock_date(self.door_count, date.today().year)
+        unlocked = max(0, min(self.door_count, (self.get_simulated_date() - first).days + 1))
+        last = min(self.door_count, unlocked + 1)
+        c = self.conn.cursor()
+        c.execute("""SELECT image_path FROM door
+                     WHERE door_num BETWEEN ? AND ? AND image_path IS NOT NULL
+                     ORDER BY door_num DESC""",
+                  (max(1, last - PREFETCH_LIMIT + 1), last))
+        for (image_path,) in c.fetchall():
+            self._request_door_image(door_image_ref(image_path))
+
+    def _request_door_image(self, path, callback=None):
+        """
+        decode path at the current door image size on the pool unless it is
+        cached already; callback() runs on the Tk thread once it is ready
+        """
+        cache = image_cache.shared_cache()
+        box = self.door_image_box()
+        if not image_cache.image_exists(path) or cache.contains(path, box=box):
+            return
+
+        def done(image, error):
+            if error is None:
+                cache.put_image(path, image, box=box)
+                image_cache.get_photo(path, box=box)
+            if callback is not None:
+                callback()
+
+        # submit() only queues the decode once per key; later callers just wait on it
+        self.decoder.submit(("door_image", path, box), cache.decode, path, None, box,
+                            callback=done)
 
     def get_simulated_date(self):
         return date.today() + timedelta(days=self.sim_day_offset)
@@ -217,74 +366,49 @@ class ViewerApp(tk.Tk):
     def door_unlock_date(self, door_num):
         # returns a date object for the door's unlock date in the current year
         yr = date.today().year
-        day = DOOR_DATES[door_num - 1]
-        return date(yr, 12, day)
+        return door_unlock_date(door_num, self.door_count, yr)
 
     def attempt_open_door(self, door_num):
         today = self.get_simulated_date()
         unlock = self.door_unlock_date(door_num)
         if today >= unlock:
+            self.state.mark_opened(door_num)
+            self.door_grid.update_info(door_num, badge="✓")
             self.show_door_content(door_num)
         else:
             messagebox.showerror("Not available", "Message unavailable!\nCome back later on door's date.\nPress Increment Day to simulate openings.")
-            self.show_doors_page()
 
     def show_door_content(self, door_num):
-        self.clear_frame()
+        self.pages.show("door_content", door_num)
 
-        root = tk.Frame(self, bg=GREEN)
-        root.pack(expand=True, fill="both")
+    def _build_door_content(self, parent):
+        root = tk.Frame(parent, bg=GREEN)
         self.show_background_images(root)
 
-        c = self.conn.cursor()
-        c.execute("SELECT message, image_path, date_day FROM door WHERE door_num = ?", (door_num,))
-        row = c.fetchone()
-        message, image_path, date_day = (None, None, DOOR_DATES[door_num - 1])
-        if row:
-            message, image_path, = row[0], row[1]
-
-        top = tk.Label(root, text=f"DOOR {door_num}", font=("Georgia", 35),
+        self.door_title_lbl = tk.Label(root, text="DOOR", font=("Georgia", 35),
                         bg="#809059", fg="white")
-        top.pack(pady=8)
+        self.door_title_lbl.pack(pady=8)
 
         # Date line
-        dt = date(self.get_simulated_date().year, 12, date_day)
-        suffix = self.ordinal_suffix(dt.day)
-        date_lbl = tk.Label(root, text=f"DATE: DECEMBER {dt.day}{suffix}",
+        self.door_date_lbl = tk.Label(root, text="DATE:",
                             font=("Georgia", 16), bg="#809059", fg="white")
-        date_lbl.pack()
+        self.door_date_lbl.pack()
 
-        # If message exists show it; else default message
-        if message:
-            msg_box = ScrolledText(root, height=8, width=70)
-            msg_box.insert(tk.END, message)
-            msg_box.configure(state="disabled")
-            msg_box.pack(pady=10)
-            
-        else:
-            days_left = 25 - dt.day
-            default_msg = f"Happy Christmas {self.viewer_name}, {days_left} days left!"
-            lbl = tk.Label(root, text=default_msg, font=("Georgia", 25), bg="#809059", fg="white")
-            lbl.pack(pady=10)
+        # message area: either the stored message or a default greeting
+        msg_holder = tk.Frame(root, bg=GREEN)
+        msg_holder.pack()
+        self.msg_box = ScrolledText(msg_holder, height=8, width=70)
+        self.default_msg_lbl = tk.Label(msg_holder, font=("Georgia", 25), bg="#809059", fg="white")
 
         # Image if exists
-        if image_path and os.path.exists(image_path):
-            try:
-                pil = Image.open(image_path)
-                pil.thumbnail((400, 300))
-                tkimg = ImageTk.PhotoImage(pil)
-                lbl_img = tk.Label(root, image=tkimg, bg="#809059")
-                lbl_img.image = tkimg  # keep ref
-                lbl_img.pack(pady=10)
-            except Exception as e:
-                # image can't be opened
-                pass
-        
+        img_holder = tk.Frame(root, bg=GREEN)
+        img_holder.pack()
+        self.door_img_lbl = tk.Label(img_holder, bg="#809059")
 
         # Button
         btn_holder = tk.Canvas(root, width=230, height=70, bg=GREEN, highlightthickness=0)
         btn_holder.pack()
-        self.pill(btn_holder, 10, 10, 220, 60, fill=PEACH, outline=PEACH)
+        pill(btn_holder, 10, 10, 220, 60, fill=PEACH, outline=PEACH)
         text_id = btn_holder.create_text(
             115, 35,
             text="SAVE",
@@ -292,31 +416,113 @@ class ViewerApp(tk.Tk):
             font=("Georgia", 16, "bold")
         )
         btn_holder.bind("<Button-1>", lambda e: self.show_doors_page())
+        return root
+
+    def _refresh_door_content(self, door_num):
+        # the grid already loaded this door's page when it scrolled into view
+        row = self.door_grid.door_info(door_num) or {}
+        message, image_path = row.get("message"), door_image_ref(row.get("image_path"))
+
+        self.door_title_lbl.configure(text=f"DOOR {door_num}")
+
+        # Date line
+        dt = self.door_unlock_date(door_num)
+        suffix = self.ordinal_suffix(dt.day)
+        self.door_date_lbl.configure(text=f"DATE: {dt.strftime('%B').upper()} {dt.day}{suffix}")
+
+        # If message exists show it; else default message
+        self.msg_box.pack_forget()
+        self.default_msg_lbl.pack_forget()
+        if message:
+            self.msg_box.configure(state="normal")
+            self.msg_box.delete("1.0", tk.END)
+            self.msg_box.insert(tk.END, message)
+            self.msg_box.configure(state="disabled")
+            self.msg_box.pack(pady=10)
+
+        else:
+            days_left = (date(dt.year, 12, 25) - dt).days
+            default_msg = f"Happy Christmas {self.viewer_name}, {days_left} days left!"
+            self.default_msg_lbl.configure(text=default_msg)
+            self.default_msg_lbl.pack(pady=10)
+
+        # Image if exists
+        self.shown_door = door_num
+        self.shown_image = image_path
+        self.door_img_lbl.pack_forget()
+        self.door_img_lbl.configure(image="", text="")
+        self.door_img_lbl.image = None
+        self._show_door_image(door_num, image_path)
+
+    def _show_door_image(self, door_num, image_path):
+        """
+        show the image at the current size. Until it is decoded, the nearest
+        size already in the cache stands in for it (or a placeholder)
+        """
+        if not image_path or not image_cache.image_exists(image_path):
+            return
+        box = self.door_image_box()
+        cache = image_cache.shared_cache()
+        if cache.contains(image_path, box=box):
+            self._set_door_image(image_path, box)
+            return
+
+        nearest = cache.nearest_photo(image_path, box)
+        if nearest is not None:
+            self.door_img_lbl.configure(image=nearest, text="")
+            self.door_img_lbl.image = nearest  # keep ref
+        else:
+            # placeholder until the decoder has the image ready
+            self.door_img_lbl.configure(text="Loading image…", fg="white", font=("Georgia", 14))
+        self.door_img_lbl.pack(pady=10)
+        self._request_door_image(
+            image_path,
+            lambda: (self.shown_door == door_num and self.door_image_box() == box
+                     and self._set_door_image(image_path, box))
+        )
+
+    def _set_door_image(self, image_path, box):
+        try:
+            tkimg = image_cache.get_photo(image_path, box=box)
+            self.door_img_lbl.configure(image=tkimg, text="")
+            self.door_img_lbl.image = tkimg  # keep ref
+            self.door_img_lbl.pack(pady=10)
+        except Exception as e:
+            # image can't be opened
+            self.door_img_lbl.pack_forget()
 
     def increment_day(self):
         current = self.get_simulated_date()
         yr = current.year
-        dec13 = date(yr, 12, 13)
-        if current < dec13:
-            # set to Dec 13
-            delta = (dec13 - date.today()).days
+        first_door = first_unlock_date(self.door_count, yr)
+        if current < first_door:
+            # set to the first door's date (Dec 13 for 12 doors)
+            delta = (first_door - date.today()).days
             self.sim_day_offset = delta
         else:
             # increment simulated day by 1
             self.sim_day_offset += 1
         self._update_current_date_display()
         messagebox.showinfo("Date changed", f"Simulated date set to {self.get_simulated_date().strftime('%B %d')}")
-        # The spec also asked to store dates in DB accordingly. We'll store the simulated offset in settings table.
-        c = self.conn.cursor()
-        c.execute("CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT)")
-        c.execute("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)", ("sim_day_offset", str(self.sim_day_offset)))
-        self.conn.commit()
+        # the content database is read-only, the offset goes in the state store
+        self.state.sim_day_offset = self.sim_day_offset
+        self.state.save()
 
     def on_close(self):
+        self.decoder.shutdown()
         self.conn.close()
+        if self.bundle is not None:
+            self.bundle.close()
         self.destroy()
 
 if __name__ == "__main__":
-    app = ViewerApp()
+    # optional argument: path to a .advent bundle (default calendar.advent)
+    args = startup_profile.args()
+    app = ViewerApp(args[0] if args else None)
     app.protocol("WM_DELETE_WINDOW", app.on_close)
+    startup_profile.watch_first_frame(app)
+    if os.environ.get("ADVENT_WATCHDOG", "") not in ("", "0"):
+        import stall_watchdog  # opt-in, only loaded when asked for
+
+        stall_watchdog.start(app)
     app.mainloop()
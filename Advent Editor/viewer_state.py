@@ -0,0 +1,46 @@
+"""
+Small per-calendar state store for the viewer.
+
+The calendar content is opened read-only, so what the viewer changes (the
+simulated day offset, which doors were opened) is kept in a JSON file in the
+user's home folder instead, one file per calendar.
+"""
+import json
+import os
+import zlib
+
+STATE_DIR = os.path.join(os.path.expanduser("~"), ".twelve_clicks")
+
+
+class ViewerState:
+    """
+    state = ViewerState(calendar_path)
+    state.sim_day_offset, state.opened (set of door numbers), state.save()
+    """
+
+    def __init__(self, calendar_path, state_dir=STATE_DIR):
+        # crc32 rather than hashlib: loading OpenSSL costs the viewer ~5 ms of startup
+        key = f"{zlib.crc32(os.path.abspath(calendar_path).encode('utf-8')):08x}"
+        self.path = os.path.join(state_dir, f"{key}.json")
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        self.sim_day_offset = int(data.get("sim_day_offset", 0))
+        self.opened = set(data.get("opened", []))
+
+    def mark_opened(self, door_num):
+        if door_num not in self.opened:
+            self.opened.add(door_num)
+            self.save()
+
+    def save(self):
+        data = {"sim_day_offset": self.sim_day_offset, "opened": sorted(self.opened)}
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(self.path + ".tmp", self.path)
+        except OSError:
+            pass  # e.g. no writable home folder: the state only lasts this session
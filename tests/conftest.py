@@ -0,0 +1,5 @@
+import os
+import sys
+
+# the apps import their modules as top level modules from Advent Editor/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "Advent Editor"))
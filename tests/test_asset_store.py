@@ -0,0 +1,73 @@
+import os
+
+import pytest
+
+from asset_store import collect_garbage, unused_files
+from database import SqliteRepo
+
+
+@pytest.fixture
+def store(tmp_path):
+    with SqliteRepo(str(tmp_path / "advent.db"), shared=False) as repo:
+        yield repo, str(tmp_path / "assets")
+
+
+def add_file(store_dir, name):
+    os.makedirs(store_dir, exist_ok=True)
+    path = os.path.join(store_dir, name)
+    with open(path, "wb") as f:
+        f.write(b"x" * 100)
+    return path
+
+
+def blob(char, ext=".jpg"):
+    return char * 64 + ext
+
+
+def test_only_unreferenced_store_files(store):
+    repo, store_dir = store
+    kept = add_file(store_dir, blob("a"))
+    dropped = add_file(store_dir, blob("b", ".png"))
+    repo.update_door(1, None, kept)
+    repo.update_door(2, None, dropped)
+    repo.update_door(2, None, None)
+    assert unused_files(repo, store_dir) == [(dropped, dropped)]
+
+
+def test_leaves_other_files_alone(store):
+    repo, store_dir = store
+    # not named by content hash, or never counted in the asset table
+    legacy = add_file(store_dir, "door1.jpg")
+    unknown = add_file(store_dir, blob("c"))
+    repo.update_door(1, None, legacy)
+    repo.update_door(1, None, None)
+    assert unused_files(repo, store_dir) == []
+    assert collect_garbage(repo, store_dir) == (0, 0)
+    assert os.path.exists(legacy) and os.path.exists(unknown)
+
+
+def test_file_outside_the_store(store, tmp_path):
+    repo, store_dir = store
+    outside = add_file(str(tmp_path / "elsewhere"), blob("d"))
+    repo.update_door(1, None, outside)
+    repo.update_door(1, None, None)
+    assert unused_files(repo, store_dir) == []
+
+
+def test_still_referenced_under_another_path(store):
+    repo, store_dir = store
+    path = add_file(store_dir, blob("e"))
+    repo.update_door(1, None, path)
+    repo.update_door(2, None, os.path.join(store_dir, ".", blob("e")))
+    repo.update_door(1, None, None)
+    assert unused_files(repo, store_dir) == []
+
+
+def test_collect_garbage(store):
+    repo, store_dir = store
+    path = add_file(store_dir, blob("f"))
+    repo.update_door(1, None, path)
+    repo.update_door(1, None, None)
+    assert collect_garbage(repo, store_dir) == (1, 100)
+    assert not os.path.exists(path)
+    assert repo.unreferenced_assets() == []
@@ -0,0 +1,87 @@
+import os
+
+import pytest
+
+from bundle import BundleError, BundleReader, BundleSource, BundleWriter, write_bundle
+
+
+@pytest.fixture
+def files(tmp_path):
+    src = tmp_path / "src"
+    (src / "shapes").mkdir(parents=True)
+    (src / "advent.db").write_bytes(b"sqlite" * 10000)
+    (src / "shapes" / "tree.png").write_bytes(os.urandom(5000))
+    (src / "empty.txt").write_bytes(b"")
+    return {
+        "advent.db": str(src / "advent.db"),
+        "shapes/tree.png": str(src / "shapes" / "tree.png"),
+        "empty.txt": str(src / "empty.txt"),
+    }
+
+
+def test_round_trip(tmp_path, files):
+    path = str(tmp_path / "calendar.advent")
+    write_bundle(path, files.items())
+    assert not os.path.exists(path + ".partial")
+    with BundleReader(path) as reader:
+        for name, src in files.items():
+            with open(src, "rb") as f:
+                assert bytes(reader.read(name)) == f.read()
+        assert reader.members["advent.db"]["method"] == "zlib"
+        assert reader.members["shapes/tree.png"]["method"] == "stored"
+
+
+def test_stored_members_are_not_copied(tmp_path, files):
+    path = str(tmp_path / "calendar.advent")
+    write_bundle(path, files.items())
+    with BundleReader(path) as reader:
+        data = reader.read("shapes/tree.png")
+        assert isinstance(data, memoryview)
+        data.release()
+
+
+def test_open_is_seekable(tmp_path, files):
+    path = str(tmp_path / "calendar.advent")
+    write_bundle(path, files.items())
+    with BundleReader(path) as reader, reader.open("advent.db") as f:
+        f.seek(-6, os.SEEK_END)
+        assert f.read() == b"sqlite"
+        f.seek(0)
+        assert f.read(6) == b"sqlite"
+
+
+def test_add_bytes_and_source(tmp_path):
+    path = str(tmp_path / "calendar.advent")
+    with BundleWriter(path) as writer:
+        writer.add_bytes("assets/a.jpg", b"jpeg data", compress=False)
+    with BundleReader(path) as reader:
+        source = BundleSource(reader)
+        assert source.exists(os.path.join("assets", "a.jpg"))
+        assert not source.exists("assets/b.jpg")
+        with source.open("assets/a.jpg") as f:
+            assert f.read() == b"jpeg data"
+
+
+def test_missing_member(tmp_path, files):
+    path = str(tmp_path / "calendar.advent")
+    write_bundle(path, files.items())
+    with BundleReader(path) as reader, pytest.raises(BundleError):
+        reader.read("nope")
+
+
+@pytest.mark.parametrize("content", [b"", b"not a bundle at all", b"ADVENTB1" + b"\0" * 30])
+def test_rejects_other_files(tmp_path, content):
+    path = tmp_path / "calendar.advent"
+    path.write_bytes(content)
+    with pytest.raises(BundleError):
+        BundleReader(str(path))
+
+
+def test_close_with_member_open(tmp_path, files):
+    path = str(tmp_path / "calendar.advent")
+    write_bundle(path, files.items())
+    reader = BundleReader(path)
+    f = reader.open("shapes/tree.png")
+    reader.close()
+    assert len(f.read()) == 5000
+    f.close()
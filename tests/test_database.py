@@ -0,0 +1,157 @@
+import sqlite3
+
+import pytest
+
+from advent_dates import door_dates
+from database import SCHEMA_VERSION, SqliteRepo, _fts_query
+
+
+@pytest.fixture
+def repo(tmp_path):
+    with SqliteRepo(str(tmp_path / "advent.db"), shared=False) as repo:
+        yield repo
+
+
+def make_v1_db(path, doors, name="Sarah", door_count=None):
+    """a database as the editor wrote it before PRAGMA user_version was used"""
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE viewer (id INTEGER PRIMARY KEY, name TEXT);
+        CREATE TABLE door (id INTEGER PRIMARY KEY, door_num INTEGER UNIQUE,
+                           date_day INTEGER, message TEXT, image_path TEXT);
+        CREATE TABLE settings (key TEXT PRIMARY KEY, value TEXT);
+    """)
+    conn.execute("INSERT INTO viewer(name) VALUES (?)", (name,))
+    if door_count is not None:
+        conn.execute("INSERT INTO settings(key, value) VALUES ('door_count', ?)", (str(door_count),))
+    conn.executemany("INSERT INTO door(door_num, date_day, message, image_path) VALUES (?, ?, ?, ?)",
+                     [(num, 12 + num, message, image) for num, message, image in doors])
+    conn.commit()
+    conn.close()
+
+
+def user_version(repo):
+    return repo.conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+# ------------------------------ migrations ------------------------------
+def test_new_file_gets_latest_schema(repo):
+    assert user_version(repo) == SCHEMA_VERSION
+    assert repo.list_calendars()
+    assert repo.get_door_count() == len(repo.get_all_doors())
+
+
+def test_migrates_version_1_file(tmp_path):
+    path = str(tmp_path / "old.db")
+    make_v1_db(path, [(1, "hot cocoa", "assets/a.jpg"), (2, "sledding", "assets/a.jpg"),
+                      (3, None, None)], door_count=3)
+    with SqliteRepo(path, shared=False) as repo:
+        assert user_version(repo) == SCHEMA_VERSION
+        (calendar_id, title, *_), = repo.list_calendars()
+        assert title == "Sarah"
+        assert repo.get_door_count(calendar_id) == 3
+        assert repo.get_door(1, calendar_id) == ("hot cocoa", "assets/a.jpg")
+        # the search index and the image refcounts cover the existing doors
+        assert [hit.door_num for hit in repo.search("cocoa")] == [1]
+        assert repo.conn.execute("SELECT refs FROM asset WHERE path = 'assets/a.jpg'").fetchone() == (2,)
+
+
+def test_migration_runs_once(tmp_path):
+    path = str(tmp_path / "old.db")
+    make_v1_db(path, [(1, "snow", None)])
+    SqliteRepo(path, shared=False).close()
+    with SqliteRepo(path, shared=False) as repo:
+        assert len(repo.list_calendars()) == 1
+        assert repo.get_door(1) == ("snow", None)
+
+
+def test_failed_migration_leaves_old_schema(tmp_path, monkeypatch):
+    path = str(tmp_path / "old.db")
+    make_v1_db(path, [(1, "snow", None)])
+
+    def fail(self, c):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(SqliteRepo, "_create_asset_refs", fail)
+    with pytest.raises(RuntimeError):
+        SqliteRepo(path, shared=False)
+    conn = sqlite3.connect(path)
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == 0
+    assert conn.execute("SELECT door_num, message FROM door").fetchall() == [(1, "snow")]
+    conn.close()
+
+
+# ------------------------------ search ------------------------------
+@pytest.mark.parametrize("text, query", [
+    ("", ""),
+    ("  ", ""),
+    ("snow", '"snow"*'),
+    ("hot coc", '"hot" "coc"*'),
+    ("snow m", '"snow" "m"'),            # one letter: no prefix match
+    ('say "hi', '"say" """hi"*'),         # quotes are doubled, not syntax
+    ("snow AND OR NEAR(", '"snow" "AND" "OR" "NEAR("*'),
+    ("- * ( )", ""),                      # nothing searchable
+])
+def test_fts_query(text, query):
+    assert _fts_query(text) == query
+
+
+def test_search_ignores_fts_syntax(repo):
+    repo.update_door(1, 'the "best" (snow) day*', None)
+    assert [hit.door_num for hit in repo.search('"best" (snow')] == [1]
+    assert repo.search("NEAR(") == []
+
+
+def test_search_skips_hidden_doors(repo):
+    repo.set_door_count(24)
+    repo.update_door(20, "gingerbread", None)
+    assert len(repo.search("ginger")) == 1
+    repo.set_door_count(12)
+    assert repo.search("ginger") == []
+
+
+# ------------------------------ door files ------------------------------
+@pytest.mark.parametrize("name", ["doors.jsonl", "doors.csv"])
+def test_export_import_round_trip(repo, tmp_path, name):
+    repo.update_door(1, "first, with a comma", str(tmp_path / "img" / "one.jpg"))
+    repo.update_door(2, "ünïcode ✓", None)
+    path = str(tmp_path / name)
+    assert repo.export_doors(path) == repo.get_door_count()
+
+    with SqliteRepo(str(tmp_path / "other.db"), shared=False) as other:
+        assert other.import_doors(path) == repo.get_door_count()
+        assert other.get_door(1) == ("first, with a comma", str(tmp_path / "img" / "one.jpg"))
+        assert other.get_door(2) == ("ünïcode ✓", None)
+
+
+def test_import_skips_doors_outside_the_calendar(repo, tmp_path):
+    path = tmp_path / "doors.csv"
+    path.write_text("door_num,message,image\n0,zero,\n5,five,\n99,late,\n", encoding="utf-8")
+    repo.conn.execute("DELETE FROM door WHERE door_num = 5")
+    assert repo.import_doors(str(path)) == 1
+    # a door missing from the table is created with its date
+    assert repo.get_doors(range(5, 6))[0].date_day == door_dates(repo.get_door_count())[4]
+
+
+def test_export_leaves_out_hidden_doors(repo, tmp_path):
+    repo.set_door_count(24)
+    repo.set_door_count(12)
+    assert repo.export_doors(str(tmp_path / "doors.jsonl")) == 12
+
+
+def test_import_rejects_records_without_door_num(repo, tmp_path):
+    path = tmp_path / "doors.jsonl"
+    path.write_text('{"message": "lost"}\n', encoding="utf-8")
+    with pytest.raises(ValueError):
+        repo.import_doors(str(path))
+
+
+# ------------------------------ asset refcounts ------------------------------
+def test_asset_refs_follow_door_images(repo):
+    repo.update_door(1, None, "a.jpg")
+    repo.update_door(2, None, "a.jpg")
+    repo.update_door(1, None, "b.jpg")
+    refs = dict(repo.conn.execute("SELECT path, refs FROM asset"))
+    assert refs == {"a.jpg": 1, "b.jpg": 1}
+    repo.update_door(2, None, None)
+    assert [stored for stored, _ in repo.unreferenced_assets()] == ["a.jpg"]
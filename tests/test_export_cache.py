@@ -0,0 +1,108 @@
+import os
+
+import pytest
+
+import export_cache
+from export_cache import ExportManifest, HashCache, copy_file
+
+
+@pytest.fixture
+def src(tmp_path):
+    path = tmp_path / "src.bin"
+    path.write_bytes(os.urandom(300000))
+    return str(path)
+
+
+def same(a, b):
+    with open(a, "rb") as fa, open(b, "rb") as fb:
+        return fa.read() == fb.read()
+
+
+def no_link(*args):
+    raise OSError("no hard links here")
+
+
+def no_clone(*args):
+    raise OSError("no reflinks here")
+
+
+def test_link(tmp_path, src):
+    dest = str(tmp_path / "dest")
+    assert copy_file(src, dest, link=True) == "linked"
+    assert os.path.samefile(src, dest)
+
+
+def test_no_link_unless_asked(tmp_path, src, monkeypatch):
+    monkeypatch.setattr(export_cache.os, "link", no_link)
+    dest = str(tmp_path / "dest")
+    assert copy_file(src, dest) != "linked"
+    assert same(src, dest)
+
+
+def test_falls_back_to_copy_file_range(tmp_path, src, monkeypatch):
+    if not hasattr(os, "copy_file_range"):
+        pytest.skip("no os.copy_file_range on this platform")
+    monkeypatch.setattr(export_cache.os, "link", no_link)
+    if export_cache.fcntl is not None:
+        monkeypatch.setattr(export_cache.fcntl, "ioctl", no_clone)
+    dest = str(tmp_path / "dest")
+    assert copy_file(src, dest, link=True) == "copied in kernel"
+    assert same(src, dest)
+
+
+def test_falls_back_to_plain_copy(tmp_path, src, monkeypatch):
+    monkeypatch.setattr(export_cache.os, "link", no_link)
+    if export_cache.fcntl is not None:
+        monkeypatch.setattr(export_cache.fcntl, "ioctl", no_clone)
+    monkeypatch.delattr(export_cache.os, "copy_file_range", raising=False)
+    dest = str(tmp_path / "dest")
+    assert copy_file(src, dest, link=True) == "copied"
+    assert same(src, dest)
+
+
+def test_copy_file_range_failure_still_copies(tmp_path, src, monkeypatch):
+    def fail(*args):
+        raise OSError("cross device")
+
+    if export_cache.fcntl is not None:
+        monkeypatch.setattr(export_cache.fcntl, "ioctl", no_clone)
+    monkeypatch.setattr(export_cache.os, "copy_file_range", fail, raising=False)
+    dest = str(tmp_path / "dest")
+    assert copy_file(src, dest) == "copied"
+    assert same(src, dest)
+
+
+def test_hash_cache_rehashes_changed_files(tmp_path):
+    path = tmp_path / "a.txt"
+    path.write_text("one")
+    cache = HashCache(str(tmp_path / "cache"))
+    first = cache.digest(str(path))
+    path.write_text("two!")
+    assert cache.digest(str(path)) != first
+
+
+def test_manifest_skips_unchanged_files(tmp_path, src):
+    dest, manifests = str(tmp_path / "export"), str(tmp_path / "manifests")
+    digest = export_cache.sha256_file(src)
+
+    manifest = ExportManifest(dest, manifests)
+    assert manifest.place(src, "data/src.bin", digest)
+    manifest.save()
+    assert not os.path.exists(os.path.join(dest, export_cache.LEGACY_MANIFEST_NAME))
+    assert ExportManifest.exists_for(dest, manifests)
+
+    again = ExportManifest(dest, manifests)
+    assert not again.place(src, "data/src.bin", digest)
+    assert again.skipped == 1
+
+
+def test_manifest_removes_stale_files(tmp_path, src):
+    dest, manifests = str(tmp_path / "export"), str(tmp_path / "manifests")
+    manifest = ExportManifest(dest, manifests)
+    manifest.place(src, "old.bin", "1")
+    manifest.save()
+
+    again = ExportManifest(dest, manifests)
+    again.place(src, "new.bin", "1")
+    again.remove_stale()
+    assert sorted(os.listdir(dest)) == ["new.bin"]